@@ -8,18 +8,64 @@ from .extensions import db, migrate, login_manager
 def create_app():
     load_dotenv()
 
-    app = Flask(__name__, instance_relative_config=True)
+    app = Flask(
+        __name__,
+        instance_relative_config=True,
+        template_folder="../templates",
+        static_folder="../static",
+    )
 
     # --- Config ---
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "change-me")
     app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL", "sqlite:///greystone.db")
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+    # --- Logging ---
+    app.logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+    # --- Database engine profile (pool / SQLite pragmas) ---
+    from .db_profiles import configure_database, install_sqlite_pragmas, describe
+    db_profile = configure_database(app)
+
     # --- Init extensions ---
     db.init_app(app)
+    with app.app_context():
+        install_sqlite_pragmas(db.engine, db_profile.pragmas)
+    app.logger.info("Database profile: %s", describe(db_profile))
+
+    # --- Request timings / slow log / sampling profiler ---
+    from .instrumentation import init_instrumentation
+    init_instrumentation(app)
+
+    # --- Prometheus metrics (/metrics behind METRICS_TOKEN or on METRICS_BIND) ---
+    from .metrics import init_metrics
+    init_metrics(app)
+
+    # Query budgets on hot views; N+1 warnings in debug (QUERY_* settings)
+    from .utils.query_budget import init_query_budget
+    init_query_budget(app)
+
     migrate.init_app(app, db)
     login_manager.init_app(app)
 
+    # current_user comes from a small in-process identity cache
+    from .auth.identity import init_identity_cache
+    init_identity_cache(app)
+
+    # Password hashing on a bounded pool (PASSWORD_HASH_* settings)
+    from .utils.passwords import init_passwords
+    init_passwords(app)
+    # --- Template helpers ---
+    from .i18n import init_i18n
+    init_i18n(app)
+
+    from .utils.images import init_images
+    init_images(app)
+
+    # --- Mail (delivered via the email outbox) ---
+    from .utils.email_utils import init_mail
+    init_mail(app)
+
     # --- Blueprints (your project uses `bp` names) ---
     from app.main.routes import bp as main_bp
     from app.services.routes import bp as services_bp
@@ -28,6 +74,9 @@ def create_app():
     from app.support.routes import bp as support_bp
     from app.contact.routes import bp as contact_bp
     from app.auth.routes import bp as auth_bp
+    from app.api.routes import bp as api_bp
+    from app.rent.routes import bp as rent_bp
+    from app.payments.routes import bp as payments_bp
 
     app.register_blueprint(main_bp)
     app.register_blueprint(services_bp)
@@ -36,5 +85,24 @@ def create_app():
     app.register_blueprint(support_bp)
     app.register_blueprint(contact_bp)
     app.register_blueprint(auth_bp)
+    app.register_blueprint(api_bp)
+    app.register_blueprint(rent_bp)
+    app.register_blueprint(payments_bp)
+
+    # Tool / Product / rental writes bump the catalog version stamps
+    from .catalog.versioning import install_version_listeners
+    install_version_listeners()
+
+    # FTS5 index present? Resolved once here, not on the first search request
+    from .products.search import init_product_search
+    init_product_search(app)
+
+    # Order / payment writes post to the customer ledger
+    from .ledger.balances import init_ledger
+    init_ledger(app)
+
+    # --- Full-page cache for anonymous brochure pages (needs the routes) ---
+    from .utils.page_cache import init_page_cache
+    init_page_cache(app)
 
     return app
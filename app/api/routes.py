@@ -0,0 +1,127 @@
+import base64
+import binascii
+import json
+
+from flask import jsonify, request
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import load_only
+
+from ..extensions import db
+from ..products.models import Product
+from ..rent.models import Tool
+from . import bp
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+PRODUCT_FIELDS = ("id", "part_number", "description", "uom", "unit_price_mnt")
+TOOL_FIELDS = ("id", "part_number", "name", "description", "daily_price", "daily_price_8_30", "available_qty")
+
+
+class ApiError(Exception):
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+@bp.errorhandler(ApiError)
+def handle_api_error(err):
+    return jsonify({"error": err.message}), err.status
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, key_columns) -> list:
+    """Cursor values, one per key column and of that column's Python type."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError):
+        raise ApiError("Invalid cursor.")
+    if not isinstance(values, list) or len(values) != len(key_columns):
+        raise ApiError("Invalid cursor.")
+    for value, col in zip(values, key_columns):
+        expected = col.type.python_type
+        # bool is an int to isinstance; JSON true/false is never a valid key
+        if isinstance(value, bool) or not isinstance(value, expected):
+            raise ApiError("Invalid cursor.")
+    return values
+
+
+def parse_limit() -> int:
+    limit = request.args.get("limit", DEFAULT_LIMIT, type=int)
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def parse_fields(allowed) -> tuple:
+    """?fields=part_number,name -> only those keys (unknown names are a 400)."""
+    raw = (request.args.get("fields") or "").strip()
+    if not raw:
+        return allowed
+    fields = tuple(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ApiError(f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(allowed)}.")
+    return fields
+
+
+def keyset_page(model, key_columns, fields, limit, where=()):
+    """
+    One page of `model` ordered by `key_columns`, starting after ?cursor=.
+    Uses a row-value style WHERE on the sort key instead of OFFSET, so every
+    page costs one index range scan no matter how deep the client is.
+    """
+    key_names = [c.key for c in key_columns]
+    stmt = db.select(model).options(
+        load_only(*[getattr(model, name) for name in dict.fromkeys(key_names + list(fields))])
+    ).where(*where)
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        after = decode_cursor(cursor, key_columns)
+        # (a, b) > (x, y)  ==  a > x OR (a = x AND b > y)
+        clauses = []
+        for i, col in enumerate(key_columns):
+            eq = [key_columns[j] == after[j] for j in range(i)]
+            clauses.append(and_(*eq, col > after[i]))
+        stmt = stmt.where(or_(*clauses))
+
+    rows = db.session.scalars(stmt.order_by(*[c.asc() for c in key_columns]).limit(limit + 1)).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, name) for name in key_names)
+
+    return jsonify({
+        "data": [{f: getattr(row, f) for f in fields} for row in rows],
+        "limit": limit,
+        "next_cursor": next_cursor,
+    })
+
+
+@bp.route("/products")
+def products():
+    return keyset_page(
+        Product,
+        key_columns=[Product.part_number],
+        where=[Product.is_active.is_(True)],
+        fields=parse_fields(PRODUCT_FIELDS),
+        limit=parse_limit(),
+    )
+
+
+@bp.route("/tools")
+def tools():
+    return keyset_page(
+        Tool,
+        key_columns=[Tool.name, Tool.id],
+        fields=parse_fields(TOOL_FIELDS),
+        limit=parse_limit(),
+    )
@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from flask_login import UserMixin
+from sqlalchemy import event
+
+from ..extensions import db, login_manager
+from ..metrics import CACHE_LOOKUPS
+from ..models import User
+
+IDENTITY_CACHE_SIZE = 1024
+IDENTITY_CACHE_TTL = 300  # seconds; also bounds staleness across worker processes
+
+# session.info keys: users written in the current transaction
+_CHANGED = "identity_changed_users"
+_CHANGED_ALL = "identity_changed_all"
+
+
+class CachedIdentity(UserMixin):
+    """What current_user needs, detached from any DB session."""
+    __slots__ = ("id", "name", "email", "is_admin")
+
+    def __init__(self, id, name, email, is_admin):
+        self.id = id
+        self.name = name
+        self.email = email
+        self.is_admin = bool(is_admin)
+
+    def __repr__(self):
+        return f"<CachedIdentity {self.id} {self.email}>"
+
+
+class IdentityCache:
+    """Small thread-safe LRU of user_id -> CachedIdentity with a TTL."""
+
+    def __init__(self, maxsize: int = IDENTITY_CACHE_SIZE, ttl: float = IDENTITY_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int):
+        with self._lock:
+            item = self._items.get(user_id)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._items[user_id]
+                identity = None
+            else:
+                self._items.move_to_end(user_id)
+                identity = item[1]
+        CACHE_LOOKUPS.inc("identity", "miss" if identity is None else "hit")
+        return identity
+
+    def put(self, identity: CachedIdentity):
+        with self._lock:
+            self._items[identity.id] = (time.monotonic() + self.ttl, identity)
+            self._items.move_to_end(identity.id)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._items.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+def load_identity(user_id: int):
+    row = db.session.execute(
+        db.select(User.id, User.name, User.email, User.is_admin).where(User.id == user_id)
+    ).first()
+    return CachedIdentity(*row) if row else None
+
+
+def load_user(user_id):
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+
+    cache = current_app.extensions.get("identity_cache")
+    if cache is None:
+        return load_identity(user_id)
+
+    identity = cache.get(user_id)
+    if identity is None:
+        identity = load_identity(user_id)
+        if identity is not None:
+            cache.put(identity)
+    return identity
+
+
+# --- Invalidation ------------------------------------------------------------
+# Profile / password changes go through the ORM; drop the cached identity
+# once the change is committed (not before: a rollback keeps the old data).
+
+def _on_flush(session, flush_context):
+    changed = session.info.setdefault(_CHANGED, set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            changed.add(obj.id)
+
+
+def _on_orm_execute(state):
+    if (state.is_update or state.is_delete) and state.bind_mapper is not None and state.bind_mapper.class_ is User:
+        # Bulk UPDATE/DELETE: ids unknown, drop everything on commit
+        state.session.info[_CHANGED_ALL] = True
+
+
+def _on_commit(session):
+    changed = session.info.pop(_CHANGED, None)
+    changed_all = session.info.pop(_CHANGED_ALL, False)
+    if not (changed or changed_all):
+        return
+    cache = current_app.extensions.get("identity_cache")
+    if cache is None:
+        return
+    if changed_all:
+        cache.clear()
+    else:
+        for user_id in changed:
+            cache.invalidate(user_id)
+
+
+def _on_rollback(session, previous_transaction):
+    session.info.pop(_CHANGED, None)
+    session.info.pop(_CHANGED_ALL, None)
+
+
+def init_identity_cache(app):
+    size = int(os.getenv("IDENTITY_CACHE_SIZE", IDENTITY_CACHE_SIZE))
+    ttl = float(os.getenv("IDENTITY_CACHE_TTL", IDENTITY_CACHE_TTL))
+    if size > 0 and ttl > 0:
+        app.extensions["identity_cache"] = IdentityCache(size, ttl)
+
+    login_manager.user_loader(load_user)
+
+    if not event.contains(db.session, "after_flush", _on_flush):
+        event.listen(db.session, "after_flush", _on_flush)
+        event.listen(db.session, "do_orm_execute", _on_orm_execute)
+        event.listen(db.session, "after_commit", _on_commit)
+        event.listen(db.session, "after_soft_rollback", _on_rollback)
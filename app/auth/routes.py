@@ -3,6 +3,7 @@ from flask_login import login_user, logout_user, login_required, current_user
 
 from ..extensions import db
 from ..models import User
+from ..utils.passwords import PasswordServiceBusy, needs_rehash, hash_password, verify_dummy
 from .forms import SignUpForm, LoginForm
 from . import bp
 
@@ -22,7 +23,11 @@ def signup():
             name=form.name.data.strip(),
             email=form.email.data.strip().lower(),
         )
-        user.set_password(form.password.data)
+        try:
+            user.set_password(form.password.data)
+        except PasswordServiceBusy as e:
+            flash(str(e), "warning")
+            return render_template("auth/signup.html", form=form), 503
 
         db.session.add(user)
         db.session.commit()
@@ -41,7 +46,22 @@ def login():
     form = LoginForm()
     if form.validate_on_submit():
         user = User.query.filter_by(email=form.email.data.strip().lower()).first()
-        if not user or not user.check_password(form.password.data):
+        try:
+            if user is None:
+                verify_dummy(form.password.data)
+                ok = False
+            else:
+                ok = user.check_password(form.password.data)
+
+            # Cost was raised since this hash was made: upgrade it now that we know the password
+            if ok and needs_rehash(user.password_hash):
+                user.password_hash = hash_password(form.password.data)
+                db.session.commit()
+        except PasswordServiceBusy as e:
+            flash(str(e), "warning")
+            return render_template("auth/login.html", form=form), 503
+
+        if not ok:
             flash("Invalid email or password.", "danger")
             return render_template("auth/login.html", form=form)
 
@@ -0,0 +1 @@
+# Catalog version stamps (HTTP conditional caching for catalog pages)
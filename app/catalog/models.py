@@ -0,0 +1,10 @@
+from datetime import datetime
+from ..extensions import db
+
+
+class CatalogVersion(db.Model):
+    # One row per scope ("products", "tools", "rentals"); bumped in the same
+    # transaction as the write that changes what the catalog pages show
+    name = db.Column(db.String(40), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
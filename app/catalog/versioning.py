@@ -0,0 +1,155 @@
+import hashlib
+from datetime import date, datetime
+from functools import wraps
+
+from flask import current_app, make_response, request, session
+from sqlalchemy import event, insert, update
+
+from ..extensions import db
+from ..i18n import get_lang
+from ..metrics import CACHE_LOOKUPS
+from .models import CatalogVersion
+
+# Writes to these tables change what the catalog pages show.
+# "order" is here because cancelling an order frees its rented units.
+# Keyed by table name so this module needs no model imports (the blueprint
+# packages import it from their routes).
+TRACKED = {
+    "product": "products",
+    "tool": "tools",
+    "rental_request": "rentals",
+    "order": "rentals",
+}
+SCOPES = tuple(dict.fromkeys(TRACKED.values()))
+
+# session.info key: scopes already bumped in the current transaction
+_BUMPED = "catalog_versions_bumped"
+
+
+# --- Bumping -----------------------------------------------------------------
+
+def bump(scopes, connection=None):
+    """
+    Increment the version of each scope. Runs on `connection` (the writer's
+    own transaction when called from the listeners) so the stamp commits or
+    rolls back together with the data.
+    """
+    conn = connection or db.session.connection()
+    now = datetime.utcnow()
+    table = CatalogVersion.__table__
+    for scope in scopes:
+        result = conn.execute(
+            update(table).where(table.c.name == scope).values(version=table.c.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            conn.execute(insert(table).values(name=scope, version=1, updated_at=now))
+
+
+def _bump_once(session, scopes):
+    done = session.info.setdefault(_BUMPED, set())
+    todo = [s for s in scopes if s not in done]
+    if todo:
+        bump(todo, session.connection())
+        done.update(todo)
+
+
+def _forget(session, *args):
+    session.info.pop(_BUMPED, None)
+
+
+def _scope_of(obj):
+    table = getattr(obj, "__table__", None)
+    return TRACKED.get(table.name) if table is not None else None
+
+
+def _on_flush(session, flush_context):
+    scopes = set()
+    for obj in list(session.new) + list(session.deleted):
+        scope = _scope_of(obj)
+        if scope:
+            scopes.add(scope)
+    for obj in session.dirty:
+        scope = _scope_of(obj)
+        if scope and session.is_modified(obj, include_collections=False):
+            scopes.add(scope)
+    if scopes:
+        _bump_once(session, scopes)
+
+
+def _on_orm_execute(state):
+    # Bulk insert(Tool) / update(Product) from the seeders never flush objects
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    mapper = state.bind_mapper
+    scope = TRACKED.get(mapper.local_table.name) if mapper is not None else None
+    if scope:
+        _bump_once(state.session, [scope])
+
+
+def install_version_listeners():
+    if event.contains(db.session, "after_flush", _on_flush):
+        return
+    event.listen(db.session, "after_flush", _on_flush)
+    event.listen(db.session, "do_orm_execute", _on_orm_execute)
+    event.listen(db.session, "after_commit", _forget)
+    event.listen(db.session, "after_soft_rollback", _forget)
+
+
+# --- Reading -----------------------------------------------------------------
+
+def current_versions(scopes) -> dict:
+    """{scope: (version, updated_at)} - one primary-key lookup per request."""
+    rows = db.session.execute(
+        db.select(CatalogVersion.name, CatalogVersion.version, CatalogVersion.updated_at)
+        .where(CatalogVersion.name.in_(scopes))
+    )
+    return {name: (version, updated_at) for name, version, updated_at in rows}
+
+
+def catalog_cached(*scopes, session_keys=(), daily=False):
+    """
+    Conditional GET for catalog pages: the ETag comes from the version
+    stamps of `scopes` (plus language, user, the listed session keys, the
+    query string and, with `daily`, today's date, since the default date
+    window moves). A matching If-None-Match gets a 304 before the view
+    queries or renders anything. No Last-Modified: a date can't say that the
+    cart, language or query changed, so If-Modified-Since alone would serve
+    stale pages.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ("GET", "HEAD") or session.get("_flashes"):
+                return view(*args, **kwargs)
+
+            versions = current_versions(scopes)
+            today = date.today()
+            parts = [
+                sorted((name, v) for name, (v, _) in versions.items()),
+                request.full_path,
+                get_lang(),
+                session.get("_user_id"),
+                [session.get(k) for k in session_keys],
+                today.isoformat() if daily else None,
+            ]
+            etag = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+            if request.if_none_match.contains_weak(etag):  # RFC 9110: weak comparison
+                CACHE_LOOKUPS.inc("catalog_etag", "hit")
+                response = current_app.response_class(status=304)
+            else:
+                CACHE_LOOKUPS.inc("catalog_etag", "miss")
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.vary.update(("Cookie", "Accept-Language"))
+            response.cache_control.no_cache = True
+            if "_user_id" in session:
+                response.cache_control.private = True
+            return response
+
+        return wrapper
+
+    return decorator
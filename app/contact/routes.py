@@ -19,14 +19,15 @@ def contact():
             message=form.message.data.strip(),
         )
         db.session.add(record)
-        db.session.commit()
 
-        # Send confirmation email (won't crash if SMTP not configured)
+        # Confirmation email goes to the outbox in the same commit; SMTP happens later
         send_basic_email(
             to_email=record.email,
             subject="Grey Stone - Message received",
             body=f"Hello {record.name},\n\nWe received your message:\nSubject: {record.subject}\n\nWe will reply soon.\n\n- Grey Stone",
+            commit=False,
         )
+        db.session.commit()
 
         flash("Message sent successfully!", "success")
         return redirect(url_for("contact.contact"))
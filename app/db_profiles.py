@@ -0,0 +1,124 @@
+import os
+import time
+from collections import namedtuple
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+from .metrics import DB_POOL_TIMEOUTS, DB_POOL_WAIT
+
+# name: "sqlite" / "sqlite-memory" / "server"
+# engine_options: passed to Flask-SQLAlchemy (SQLALCHEMY_ENGINE_OPTIONS)
+# pragmas: run on every new SQLite connection
+DatabaseProfile = namedtuple("DatabaseProfile", "name engine_options pragmas")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports how long checkouts wait (incl. opening overflow connections)."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - started)
+
+
+def sqlite_profile(url) -> DatabaseProfile:
+    if url.database in (None, "", ":memory:"):
+        # In-memory DBs live in a single connection; leave pooling to SQLAlchemy
+        return DatabaseProfile("sqlite-memory", {}, {})
+
+    busy_timeout_ms = _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000)
+    pragmas = {
+        # Readers don't block the writer (and vice versa)
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        # Safe with WAL; fsync on checkpoint instead of every commit
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        # Wait for the write lock instead of failing with "database is locked"
+        "busy_timeout": busy_timeout_ms,
+        "mmap_size": _env_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024),
+        # Negative = KiB
+        "cache_size": -_env_int("SQLITE_CACHE_KIB", 64 * 1024),
+        "temp_store": "MEMORY",
+    }
+    engine_options = {
+        "poolclass": TimedQueuePool,
+        "pool_size": _env_int("DB_POOL_SIZE", 5),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 10),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+        "connect_args": {
+            "timeout": busy_timeout_ms / 1000,
+            "check_same_thread": False,
+        },
+    }
+    return DatabaseProfile("sqlite", engine_options, pragmas)
+
+
+def server_profile(url) -> DatabaseProfile:
+    engine_options = {
+        "poolclass": TimedQueuePool,
+        "pool_size": _env_int("DB_POOL_SIZE", 10),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 20),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+        # Drop connections the server / a proxy closed while idle
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+    }
+    return DatabaseProfile("server", engine_options, {})
+
+
+def resolve_profile(database_uri: str) -> DatabaseProfile:
+    url = make_url(database_uri)
+    if url.get_backend_name() == "sqlite":
+        return sqlite_profile(url)
+    return server_profile(url)
+
+
+def describe(profile: DatabaseProfile) -> str:
+    opts = {k: v for k, v in profile.engine_options.items() if k not in ("connect_args", "poolclass")}
+    parts = [f"{k}={v}" for k, v in opts.items()]
+    parts += [f"{k}={v}" for k, v in profile.pragmas.items()]
+    return f"{profile.name} ({', '.join(parts) or 'defaults'})"
+
+
+def configure_database(app) -> DatabaseProfile:
+    """
+    Pick the engine profile for SQLALCHEMY_DATABASE_URI. Call before
+    db.init_app(); explicit SQLALCHEMY_ENGINE_OPTIONS in config still win.
+    """
+    profile = resolve_profile(app.config["SQLALCHEMY_DATABASE_URI"])
+    options = dict(profile.engine_options)
+    options.update(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+    app.extensions["db_profile"] = profile
+    return profile
+
+
+def install_sqlite_pragmas(engine, pragmas: dict):
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
@@ -22,6 +22,16 @@ class ContactMessage(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
+class TrainingSession(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    course = db.Column(db.String(200), nullable=False, index=True)
+    starts_at = db.Column(db.DateTime, nullable=False)
+    duration_minutes = db.Column(db.Integer, nullable=False, default=60)
+    location = db.Column(db.String(200), nullable=False, default="Grey Stone (TBD)")
+    capacity = db.Column(db.Integer, nullable=False, default=20)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
 class TrainingRegistration(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
@@ -30,3 +40,7 @@ class TrainingRegistration(db.Model):
     phone = db.Column(db.String(50), nullable=True)
     notes = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Seat in a scheduled session (NULL = not scheduled yet)
+    session_id = db.Column(db.Integer, db.ForeignKey('training_session.id'), nullable=True, index=True)
+    invited_at = db.Column(db.DateTime, nullable=True)
@@ -0,0 +1,81 @@
+﻿import json
+import os
+from types import MappingProxyType
+
+from flask import g, request, session
+
+# One <lang>.json per language; drop a new file in to add a language
+CATALOG_DIR = os.path.join(os.path.dirname(__file__), "catalogs")
+DEFAULT_LANG = "en"
+
+
+def load_catalogs(path: str = CATALOG_DIR) -> MappingProxyType:
+    """
+    Read every catalog once into a read-only {lang: {key: text}} lookup.
+    Keys missing from a language fall back to the default language here,
+    so a lookup is a single dict.get at render time.
+    """
+    raw = {}
+    for name in sorted(os.listdir(path)):
+        lang, ext = os.path.splitext(name)
+        if ext != ".json":
+            continue
+        with open(os.path.join(path, name), encoding="utf-8") as f:
+            raw[lang] = json.load(f)
+
+    default = raw.get(DEFAULT_LANG, {})
+    return MappingProxyType({
+        lang: MappingProxyType({**default, **catalog})
+        for lang, catalog in raw.items()
+    })
+
+
+CATALOGS = load_catalogs()
+LANGUAGES = tuple(CATALOGS)
+
+
+def _make_translator(catalog):
+    get = catalog.get
+
+    def translate(key: str) -> str:
+        return get(key, key)
+
+    return translate
+
+
+# Built once: templates get the bound function for the request's language
+TRANSLATORS = MappingProxyType({lang: _make_translator(catalog) for lang, catalog in CATALOGS.items()})
+
+
+def resolve_lang() -> str:
+    lang = session.get("lang")
+    if lang in CATALOGS:
+        return lang
+    # Default: browser preference -> en fallback
+    return request.accept_languages.best_match(LANGUAGES, default=DEFAULT_LANG)
+
+
+def get_lang() -> str:
+    """Request language, resolved once and kept on `g`."""
+    lang = g.get("lang")
+    if lang is None:
+        lang = g.lang = resolve_lang()
+    return lang
+
+
+def translator(lang: str = None):
+    return TRANSLATORS.get(lang or get_lang(), TRANSLATORS[DEFAULT_LANG])
+
+
+def t(key: str) -> str:
+    return translator()(key)
+
+
+def init_i18n(app):
+    app.jinja_env.globals.update(t=t, get_lang=get_lang)
+
+    @app.context_processor
+    def _bound_translator():
+        # Overrides the global `t` for this render: no per-call language lookup
+        lang = get_lang()
+        return {"t": TRANSLATORS.get(lang, TRANSLATORS[DEFAULT_LANG]), "lang": lang}
@@ -0,0 +1,202 @@
+import collections
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+
+from flask import g, has_request_context, request
+from flask_login import current_user
+from flask.signals import before_render_template, template_rendered
+from sqlalchemy import event
+
+from .extensions import db
+
+# Statements kept per request for the slow log
+SLOWEST_KEPT = 5
+# Who gets the Server-Timing header (SQL counts/timings are internal detail)
+SERVER_TIMING_MODES = ("off", "admin", "all")
+SQL_PREVIEW_CHARS = 300
+
+
+class RequestStats:
+    __slots__ = ("started", "sql_count", "sql_seconds", "slowest", "template_seconds", "_template_started")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.slowest = []  # [(seconds, statement)], longest first, at most SLOWEST_KEPT
+        self.template_seconds = 0.0
+        self._template_started = []
+
+    def add_query(self, seconds: float, statement: str):
+        self.sql_count += 1
+        self.sql_seconds += seconds
+        if len(self.slowest) < SLOWEST_KEPT or seconds > self.slowest[-1][0]:
+            self.slowest.append((seconds, statement))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[SLOWEST_KEPT:]
+
+
+def request_stats():
+    """Stats of the current request, or None outside a request / when disabled."""
+    return g.get("_request_stats") if has_request_context() else None
+
+
+# --- Sampling profiler -------------------------------------------------------
+
+class StackSampler:
+    """
+    Samples one thread's Python stack every `interval` seconds from a helper
+    thread and aggregates "frame;frame;frame count" lines (the folded format
+    flamegraph tools read). No tracing hooks, so the request runs at speed.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+# --- Wiring ------------------------------------------------------------------
+
+def _install_sql_listeners(engine):
+    # Timed from execute to cursor return. SQLite produces rows lazily while
+    # fetching, so big result sets show up in app time (and in the profiles).
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["_query_started"].pop()
+        stats = request_stats()
+        if stats is not None:
+            stats.add_query(time.perf_counter() - started, statement)
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(context):
+        started = context.connection.info.get("_query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+
+def _install_template_listeners(app):
+    def _before_render(sender, template, context, **extra):
+        stats = request_stats()
+        if stats is not None:
+            stats._template_started.append(time.perf_counter())
+
+    def _rendered(sender, template, context, **extra):
+        stats = request_stats()
+        if stats is not None and stats._template_started:
+            stats.template_seconds += time.perf_counter() - stats._template_started.pop()
+
+    before_render_template.connect(_before_render, app, weak=False)
+    template_rendered.connect(_rendered, app, weak=False)
+
+
+def init_instrumentation(app):
+    """
+    Per-request wall / SQL / template timings (Server-Timing header, for
+    admins unless SERVER_TIMING says otherwise), a slow request log and, for
+    PROFILE_ENDPOINTS, an occasional sampled profile.
+    """
+    if os.getenv("INSTRUMENTATION_ENABLED", "true").lower() != "true":
+        return
+
+    server_timing = os.getenv("SERVER_TIMING", "admin").strip().lower()
+    if server_timing not in SERVER_TIMING_MODES:
+        raise ValueError(f"SERVER_TIMING must be one of {', '.join(SERVER_TIMING_MODES)}, not {server_timing!r}")
+
+    slow_ms = float(os.getenv("SLOW_REQUEST_MS", "500"))
+    profile_endpoints = {e.strip() for e in os.getenv("PROFILE_ENDPOINTS", "").split(",") if e.strip()}
+    profile_rate = float(os.getenv("PROFILE_SAMPLE_RATE", "0.01"))
+    profile_interval = float(os.getenv("PROFILE_INTERVAL_MS", "2")) / 1000
+    profile_dir = os.getenv("PROFILE_DIR", os.path.join(app.instance_path, "profiles"))
+
+    with app.app_context():
+        _install_sql_listeners(db.engine)
+    _install_template_listeners(app)
+
+    @app.before_request
+    def _start_stats():
+        g._request_stats = RequestStats()
+        endpoint = request.endpoint
+        if endpoint in profile_endpoints and random.random() < profile_rate:
+            g._sampler = StackSampler(threading.get_ident(), profile_interval).start()
+
+    @app.after_request
+    def _finish_stats(response):
+        stats = request_stats()
+        if stats is None:
+            return response
+        wall_ms = (time.perf_counter() - stats.started) * 1000
+        sql_ms = stats.sql_seconds * 1000
+        tpl_ms = stats.template_seconds * 1000
+
+        if server_timing == "all" or (
+            server_timing == "admin" and current_user.is_authenticated and current_user.is_admin
+        ):
+            response.headers.add(
+                "Server-Timing",
+                f'app;dur={wall_ms:.1f}, db;dur={sql_ms:.1f};desc="{stats.sql_count} queries", tpl;dur={tpl_ms:.1f}',
+            )
+
+        if wall_ms >= slow_ms:
+            slowest = "\n".join(
+                f"    {seconds * 1000:8.1f} ms  {' '.join(statement.split())[:SQL_PREVIEW_CHARS]}"
+                for seconds, statement in stats.slowest
+            )
+            app.logger.warning(
+                "Slow request %s %s -> %s: %.1f ms (SQL %d statements, %.1f ms; templates %.1f ms)%s",
+                request.method, request.full_path.rstrip("?"), response.status_code,
+                wall_ms, stats.sql_count, sql_ms, tpl_ms,
+                f"\n  Slowest statements:\n{slowest}" if slowest else "",
+            )
+        return response
+
+    @app.teardown_request
+    def _finish_profile(exc):
+        # Teardown runs even when the view or an after_request hook raised;
+        # a sampler left running would keep sampling this thread for good
+        sampler = g.pop("_sampler", None)
+        if sampler is None:
+            return
+        sampler.stop()
+        path = os.path.join(profile_dir, f"{request.endpoint}-{datetime.utcnow():%Y%m%dT%H%M%S%f}.folded")
+        try:
+            os.makedirs(profile_dir, exist_ok=True)
+            sampler.dump(path)
+        except OSError as e:
+            app.logger.warning("Could not write profile for %s: %s", request.endpoint, e)
+        else:
+            app.logger.info("Profile for %s written to %s", request.endpoint, path)
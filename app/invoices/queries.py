@@ -0,0 +1,112 @@
+from collections import namedtuple
+
+from sqlalchemy import case, func
+
+from ..extensions import db
+from ..payments.models import Order, Payment
+from ..rent.models import RentalRequest, Tool
+
+ORDER_STATUSES = ("pending", "paid", "completed", "cancelled")
+PER_PAGE = 20
+MAX_PER_PAGE = 100
+
+Invoice = namedtuple(
+    "Invoice",
+    "id created_at status total_amount paid_amount payment_status payment_method lines",
+)
+InvoiceLine = namedtuple("InvoiceLine", "tool_name start_date end_date quantity days total_cost")
+InvoicePage = namedtuple("InvoicePage", "invoices next_after")
+StatusTotal = namedtuple("StatusTotal", "status count amount")
+
+
+def payment_status(total_amount: int, paid_amount: int, payments: int, failed: int) -> str:
+    if not payments:
+        return "none"
+    if paid_amount >= total_amount:
+        return "paid"
+    if paid_amount > 0:
+        return "partial"
+    return "failed" if failed == payments else "unpaid"
+
+
+def invoice_page(user_id: int, status: str = None, after: int = None, per_page: int = PER_PAGE) -> InvoicePage:
+    """
+    One page of the user's orders, newest first, with payment totals and
+    rental lines - a single statement. Keyset pagination on order id
+    (`after` = last id of the previous page), so page 100 costs the same
+    as page 1 on the (user_id, status, id) indexes.
+    """
+    per_page = max(1, min(per_page, MAX_PER_PAGE))
+
+    page = db.select(Order.id).where(Order.user_id == user_id)
+    if status:
+        page = page.where(Order.status == status)
+    if after:
+        page = page.where(Order.id < after)
+    # One extra row tells whether there is a next page
+    page = page.order_by(Order.id.desc()).limit(per_page + 1).subquery()
+
+    # Method of the settled payments; blank when nothing is paid or they used different methods
+    paid_method = case((Payment.status == "paid", Payment.method))
+    paid = (
+        db.select(
+            Payment.order_id,
+            func.count(Payment.id).label("payments"),
+            func.coalesce(func.sum(case((Payment.status == "paid", Payment.amount), else_=0)), 0).label("paid_amount"),
+            func.sum(case((Payment.status == "failed", 1), else_=0)).label("failed"),
+            case((func.count(paid_method.distinct()) == 1, func.max(paid_method))).label("method"),
+        )
+        .join(page, page.c.id == Payment.order_id)
+        .group_by(Payment.order_id)
+        .subquery()
+    )
+
+    rows = db.session.execute(
+        db.select(
+            Order.id, Order.created_at, Order.status, Order.total_amount,
+            paid.c.payments, paid.c.paid_amount, paid.c.failed, paid.c.method,
+            Tool.name, RentalRequest.start_date, RentalRequest.end_date,
+            RentalRequest.quantity, RentalRequest.days, RentalRequest.total_cost,
+        )
+        .join(page, page.c.id == Order.id)
+        .outerjoin(paid, paid.c.order_id == Order.id)
+        .outerjoin(RentalRequest, RentalRequest.order_id == Order.id)
+        .outerjoin(Tool, Tool.id == RentalRequest.tool_id)
+        .order_by(Order.id.desc(), RentalRequest.id)
+    ).all()
+
+    invoices = []
+    for row in rows:
+        if not invoices or invoices[-1].id != row.id:
+            invoices.append(Invoice(
+                id=row.id,
+                created_at=row.created_at,
+                status=row.status,
+                total_amount=row.total_amount,
+                paid_amount=row.paid_amount or 0,
+                payment_status=payment_status(row.total_amount, row.paid_amount or 0, row.payments or 0, row.failed or 0),
+                payment_method=row.method,
+                lines=[],
+            ))
+        if row.start_date is not None:
+            invoices[-1].lines.append(InvoiceLine(
+                row.name or "—", row.start_date, row.end_date, row.quantity, row.days, row.total_cost,
+            ))
+
+    next_after = None
+    if len(invoices) > per_page:
+        invoices = invoices[:per_page]
+        next_after = invoices[-1].id
+    return InvoicePage(invoices, next_after)
+
+
+def status_totals(user_id: int) -> list:
+    """Order count and amount per status, in ORDER_STATUSES order (GROUP BY on the user's index range)."""
+    rows = db.session.execute(
+        db.select(Order.status, func.count(Order.id), func.coalesce(func.sum(Order.total_amount), 0))
+        .where(Order.user_id == user_id)
+        .group_by(Order.status)
+    ).all()
+    found = {status: StatusTotal(status, count, amount) for status, count, amount in rows}
+    ordered = [found.pop(s, StatusTotal(s, 0, 0)) for s in ORDER_STATUSES]
+    return ordered + sorted(found.values())
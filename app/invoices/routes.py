@@ -1,16 +1,44 @@
-﻿from flask import render_template
-from flask_login import login_required
+﻿from flask import render_template, request
+from flask_login import login_required, current_user
+
+from ..ledger.balances import get_account, recent_entries
+from ..utils.query_budget import query_budget
+from .queries import ORDER_STATUSES, PER_PAGE, invoice_page, status_totals
 from . import bp
 
 @bp.route('/')
 @login_required
+@query_budget(2)
 def invoices():
-    return render_template('invoices/invoices.html')
+    status = request.args.get('status')
+    if status not in ORDER_STATUSES:
+        status = None
+    after = request.args.get('after', type=int)
+    per_page = request.args.get('per_page', PER_PAGE, type=int)
+
+    page = invoice_page(current_user.id, status=status, after=after, per_page=per_page)
+    return render_template(
+        'invoices/invoices.html',
+        invoices=page.invoices,
+        next_after=page.next_after,
+        totals=status_totals(current_user.id),
+        status=status,
+        after=after,
+    )
 
 @bp.route('/credits')
 @login_required
+@query_budget(2)
 def credits():
-    return render_template('invoices/credits.html')
+    before = request.args.get('before', type=int)
+    entries, next_before = recent_entries(current_user.id, before=before)
+    return render_template(
+        'invoices/credits.html',
+        account=get_account(current_user.id),
+        entries=entries,
+        next_before=next_before,
+        before=before,
+    )
 
 @bp.route('/special-offer')
 @login_required
@@ -0,0 +1 @@
+# Customer ledger (append-only entries + per-user balance snapshot)
@@ -0,0 +1,268 @@
+import os
+from collections import defaultdict, namedtuple
+from datetime import datetime
+
+from flask import current_app, has_app_context
+from sqlalchemy import case, event, func, inspect, insert, update
+
+from ..extensions import db
+from ..payments.models import Order, Payment
+from .models import CustomerBalance, LedgerEntry
+
+# Orders in these states owe nothing
+VOID_ORDER_STATUSES = ("cancelled",)
+# Payments in these states have settled their amount
+SETTLED_PAYMENT_STATUSES = ("paid",)
+
+# Rows per executemany INSERT of entries
+ENTRY_CHUNK_SIZE = 500
+
+Posting = namedtuple("Posting", "user_id kind amount order_id payment_id note")
+Posting.__new__.__defaults__ = (None, None, None)
+Account = namedtuple("Account", "balance credit_limit available")
+Mismatch = namedtuple("Mismatch", "user_id snapshot ledger expected")
+
+
+def order_effect(status, total_amount) -> int:
+    return 0 if status in VOID_ORDER_STATUSES else (total_amount or 0)
+
+
+def payment_effect(status, amount) -> int:
+    return -(amount or 0) if status in SETTLED_PAYMENT_STATUSES else 0
+
+
+def default_credit_limit():
+    if has_app_context():
+        return current_app.config.get("LEDGER_DEFAULT_CREDIT_LIMIT")
+    return None
+
+
+# --- Posting -----------------------------------------------------------------
+
+def post(postings, connection=None) -> int:
+    """
+    Append entries and move the balance snapshots by the same amounts, on
+    `connection` (the writer's transaction when called from the listener),
+    so entries and balances commit or roll back together. Writers that
+    bypass the ORM (bulk UPDATEs) must call this themselves.
+    """
+    postings = [p for p in postings if p.amount]
+    if not postings:
+        return 0
+    conn = connection or db.session.connection()
+    now = datetime.utcnow()
+
+    rows = [{**p._asdict(), "created_at": now} for p in postings]
+    for i in range(0, len(rows), ENTRY_CHUNK_SIZE):
+        conn.execute(insert(LedgerEntry.__table__), rows[i:i + ENTRY_CHUNK_SIZE])
+
+    deltas = defaultdict(int)
+    for p in postings:
+        deltas[p.user_id] += p.amount
+
+    table = CustomerBalance.__table__
+    missing = []
+    for user_id, delta in deltas.items():
+        result = conn.execute(
+            update(table).where(table.c.user_id == user_id)
+            .values(balance=table.c.balance + delta, updated_at=now)
+        )
+        if result.rowcount == 0:
+            missing.append({"user_id": user_id, "balance": delta, "credit_limit": default_credit_limit(), "updated_at": now})
+    if missing:
+        conn.execute(insert(table), missing)
+    return len(postings)
+
+
+def _before(obj, attr):
+    """Value of `attr` before this flush (the current one when unchanged)."""
+    history = inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    return history.unchanged[0] if history.unchanged else getattr(obj, attr)
+
+
+def _order_postings(obj, new: bool, deleted: bool) -> list:
+    before = 0 if new else order_effect(_before(obj, "status"), _before(obj, "total_amount"))
+    after = 0 if deleted else order_effect(obj.status, obj.total_amount)
+    delta = after - before
+    if not delta:
+        return []
+    kind = "charge" if delta > 0 else "charge_reversal"
+    return [Posting(obj.user_id, kind, delta, order_id=obj.id)]
+
+
+def _payment_delta(obj, new: bool, deleted: bool) -> int:
+    before = 0 if new else payment_effect(_before(obj, "status"), _before(obj, "amount"))
+    after = 0 if deleted else payment_effect(obj.status, obj.amount)
+    return after - before
+
+
+def _on_flush(session, flush_context):
+    postings = []
+    payments = []  # (payment, delta): user comes from the order
+    for state, objs in (("new", session.new), ("dirty", session.dirty), ("deleted", session.deleted)):
+        for obj in objs:
+            if state == "dirty" and not session.is_modified(obj, include_collections=False):
+                continue
+            if isinstance(obj, Order):
+                postings += _order_postings(obj, state == "new", state == "deleted")
+            elif isinstance(obj, Payment):
+                delta = _payment_delta(obj, state == "new", state == "deleted")
+                if delta:
+                    payments.append((obj, delta))
+
+    if payments:
+        order_ids = {p.order_id for p, _ in payments}
+        owners = dict(session.connection().execute(
+            db.select(Order.id, Order.user_id).where(Order.id.in_(order_ids))
+        ).all())
+        for payment, delta in payments:
+            kind = "payment" if delta < 0 else "payment_reversal"
+            postings.append(Posting(owners[payment.order_id], kind, delta, order_id=payment.order_id,
+                                    payment_id=payment.id))
+
+    if postings:
+        post(postings, session.connection())
+
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+def install_ledger_listeners():
+    if event.contains(db.session, "after_flush", _on_flush):
+        return
+    event.listen(db.session, "after_flush", _on_flush)
+    # active_history: load the old value when an expired attribute is set,
+    # otherwise `order.status = "cancelled"` after a commit has no "before"
+    for attr in (Order.status, Order.total_amount, Payment.status, Payment.amount):
+        event.listen(attr, "set", _keep_old_value, active_history=True, retval=True)
+
+
+def init_ledger(app):
+    limit = os.getenv("LEDGER_DEFAULT_CREDIT_LIMIT", "").strip()
+    app.config["LEDGER_DEFAULT_CREDIT_LIMIT"] = int(limit) if limit else None
+    install_ledger_listeners()
+
+
+# --- Reading -----------------------------------------------------------------
+
+def get_account(user_id: int) -> Account:
+    """Balance and credit headroom: one primary-key lookup."""
+    row = db.session.execute(
+        db.select(CustomerBalance.balance, CustomerBalance.credit_limit).where(CustomerBalance.user_id == user_id)
+    ).first()
+    balance, limit = row if row else (0, default_credit_limit())
+    return Account(balance, limit, None if limit is None else limit - balance)
+
+
+def recent_entries(user_id: int, before: int = None, limit: int = 20) -> tuple:
+    """(entries newest first, id to pass as `before` for the next page or None)."""
+    stmt = db.select(LedgerEntry).where(LedgerEntry.user_id == user_id)
+    if before:
+        stmt = stmt.where(LedgerEntry.id < before)
+    rows = db.session.scalars(stmt.order_by(LedgerEntry.id.desc()).limit(limit + 1)).all()
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1].id
+    return rows, None
+
+
+def set_credit_limit(user_id: int, credit_limit):
+    table = CustomerBalance.__table__
+    result = db.session.execute(
+        update(table).where(table.c.user_id == user_id).values(credit_limit=credit_limit)
+    )
+    if result.rowcount == 0:
+        db.session.execute(insert(table).values(
+            user_id=user_id, balance=0, credit_limit=credit_limit, updated_at=datetime.utcnow()
+        ))
+
+
+# --- Verify / rebuild --------------------------------------------------------
+
+def expected_balances(connection) -> dict:
+    """user_id -> balance derived from orders and payments (GROUP BY, no ledger)."""
+    expected = defaultdict(int)
+    charges = connection.execute(
+        db.select(Order.user_id, func.sum(case((Order.status.in_(VOID_ORDER_STATUSES), 0), else_=Order.total_amount)))
+        .group_by(Order.user_id)
+    )
+    for user_id, amount in charges:
+        expected[user_id] += amount or 0
+    paid = connection.execute(
+        db.select(Order.user_id, func.sum(Payment.amount))
+        .join(Order, Order.id == Payment.order_id)
+        .where(Payment.status.in_(SETTLED_PAYMENT_STATUSES))
+        .group_by(Order.user_id)
+    )
+    for user_id, amount in paid:
+        expected[user_id] -= amount or 0
+    return expected
+
+
+def ledger_balances(connection) -> dict:
+    return dict(connection.execute(
+        db.select(LedgerEntry.user_id, func.sum(LedgerEntry.amount)).group_by(LedgerEntry.user_id)
+    ).all())
+
+
+def snapshot_balances(connection) -> dict:
+    return dict(connection.execute(db.select(CustomerBalance.user_id, CustomerBalance.balance)).all())
+
+
+def verify(connection=None) -> list:
+    """Users whose snapshot, entry sum and orders/payments disagree."""
+    conn = connection or db.session.connection()
+    expected = expected_balances(conn)
+    ledger = ledger_balances(conn)
+    snapshot = snapshot_balances(conn)
+    mismatches = []
+    for user_id in sorted(set(expected) | set(ledger) | set(snapshot)):
+        values = (snapshot.get(user_id, 0), ledger.get(user_id, 0), expected.get(user_id, 0))
+        if len(set(values)) > 1:
+            mismatches.append(Mismatch(user_id, *values))
+    return mismatches
+
+
+def rebuild(connection=None) -> tuple:
+    """
+    Bring the ledger in line with orders / payments by appending
+    "adjustment" entries for any difference (history is never rewritten),
+    then recompute every snapshot from the entries.
+    Returns (adjustments posted, snapshots written).
+    """
+    conn = connection or db.session.connection()
+    expected = expected_balances(conn)
+    ledger = ledger_balances(conn)
+    adjustments = [
+        Posting(user_id, "adjustment", expected.get(user_id, 0) - ledger.get(user_id, 0), note="ledger rebuild")
+        for user_id in sorted(set(expected) | set(ledger))
+        if expected.get(user_id, 0) != ledger.get(user_id, 0)
+    ]
+    rows = [{**p._asdict(), "created_at": datetime.utcnow()} for p in adjustments]
+    for i in range(0, len(rows), ENTRY_CHUNK_SIZE):
+        conn.execute(insert(LedgerEntry.__table__), rows[i:i + ENTRY_CHUNK_SIZE])
+
+    now = datetime.utcnow()
+    table = CustomerBalance.__table__
+    entries = LedgerEntry.__table__
+    conn.execute(update(table).values(
+        balance=func.coalesce(
+            db.select(func.sum(entries.c.amount)).where(entries.c.user_id == table.c.user_id).scalar_subquery(), 0
+        ),
+        updated_at=now,
+    ))
+    conn.execute(insert(table).from_select(
+        ["user_id", "balance", "credit_limit", "updated_at"],
+        db.select(
+            entries.c.user_id,
+            func.sum(entries.c.amount),
+            db.literal(default_credit_limit(), db.Integer),
+            db.literal(now, db.DateTime),
+        )
+        .where(entries.c.user_id.notin_(db.select(table.c.user_id)))
+        .group_by(entries.c.user_id),
+    ))
+    snapshots = conn.execute(db.select(func.count()).select_from(table)).scalar()
+    return len(adjustments), snapshots
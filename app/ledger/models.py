@@ -0,0 +1,34 @@
+from datetime import datetime
+from ..extensions import db
+
+
+class LedgerEntry(db.Model):
+    """
+    Append-only: rows are never updated or deleted; corrections are new
+    entries. amount > 0 is owed by the customer (charges), < 0 settles it
+    (payments, reversals of charges).
+    """
+    # Credits page: a customer's entries newest first
+    __table_args__ = (db.Index("ix_ledger_entry_user_id_id", "user_id", "id"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+
+    kind = db.Column(db.String(20), nullable=False)  # charge/charge_reversal/payment/payment_reversal/adjustment
+    amount = db.Column(db.Integer, nullable=False)  # MNT int, signed
+
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=True, index=True)
+    payment_id = db.Column(db.Integer, db.ForeignKey('payment.id'), nullable=True)
+    note = db.Column(db.String(255), nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class CustomerBalance(db.Model):
+    """Running SUM(LedgerEntry.amount) per user, maintained in the same transaction as the entries."""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+
+    balance = db.Column(db.Integer, nullable=False, default=0)  # MNT int, > 0 = outstanding
+    credit_limit = db.Column(db.Integer, nullable=True)  # max outstanding balance; NULL = no limit
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -1,20 +1,26 @@
 ﻿from flask import render_template, redirect, url_for, session
 from flask_login import login_required, current_user
+from ..i18n import LANGUAGES
+from ..utils.page_cache import cached_page
 from . import bp
 
 @bp.route("/")
+@cached_page
 def home():
     return render_template("main/home.html")
 
 @bp.route("/about")
+@cached_page
 def about():
     return render_template("main/about.html")
 
 @bp.route("/vision")
+@cached_page
 def vision():
     return render_template("main/vision.html")
 
 @bp.route("/mission")
+@cached_page
 def mission():
     return render_template("main/mission.html")
 
@@ -25,6 +31,6 @@ def profile():
 
 @bp.route("/lang/<lang>")
 def set_language(lang):
-    if lang in ("en", "mn"):
+    if lang in LANGUAGES:
         session["lang"] = lang
     return redirect(url_for("main.home"))
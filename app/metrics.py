@@ -0,0 +1,412 @@
+import bisect
+import glob
+import hmac
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+
+from flask import abort, g, request
+from sqlalchemy import func
+
+from .extensions import db
+
+PREFIX = "greystone_"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+FLUSH_SECONDS = 5.0
+
+
+# --- Registry ----------------------------------------------------------------
+
+class Registry:
+    """
+    Counters and histograms are written lock-free: every thread adds into its
+    own dict (only that thread writes it) and a scrape sums the dicts.
+    Shards of finished threads are folded into `_retired` at scrape time, so
+    a thread-per-request server doesn't grow the list forever.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self._local = threading.local()
+        self._shards = []  # [(thread, values)]
+        self._retired = {}
+        self._lock = threading.Lock()  # shard list and scrapes only
+        self._pid = os.getpid()
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def shard(self) -> dict:
+        values = getattr(self._local, "values", None)
+        if values is None:
+            values = self._local.values = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), values))
+        return values
+
+    def reset_after_fork(self):
+        """A forked worker starts from zero (the parent's values are its own)."""
+        if self._pid == os.getpid():
+            return False
+        with self._lock:
+            self._pid = os.getpid()
+            self._local = threading.local()
+            self._shards = []
+            self._retired = {}
+        return True
+
+    def snapshot(self) -> dict:
+        """{(metric name, label values): number or [bucket counts..., sum]} for this process."""
+        with self._lock:
+            total = {key: _copy(value) for key, value in self._retired.items()}
+            live = []
+            for shard in self._shards:
+                # Liveness first: a finished thread's dict is final
+                alive = shard[0].is_alive()
+                values = dict(shard[1])  # one C-level copy; safe while the owner keeps writing
+                for key, value in values.items():
+                    _add(total, key, value)
+                if alive:
+                    live.append(shard)
+                else:
+                    for key, value in values.items():
+                        _add(self._retired, key, value)
+            self._shards = live
+        return total
+
+
+def _copy(value):
+    return list(value) if isinstance(value, list) else value
+
+
+def _add(total: dict, key, value):
+    current = total.get(key)
+    if current is None:
+        total[key] = _copy(value)
+    elif isinstance(current, list):
+        for i, v in enumerate(value):
+            current[i] += v
+    else:
+        total[key] = current + value
+
+
+REGISTRY = Registry()
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels=(), registry: Registry = REGISTRY):
+        self.name = PREFIX + name
+        self.help = help
+        self.labels = tuple(labels)
+        self.registry = registry
+        registry.register(self)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        values = self.registry.shard()
+        key = (self.name, labels)
+        values[key] = values.get(key, 0) + amount
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels=(), buckets=LATENCY_BUCKETS, registry: Registry = REGISTRY):
+        super().__init__(name, help, labels, registry)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels):
+        values = self.registry.shard()
+        key = (self.name, labels)
+        counts = values.get(key)
+        if counts is None:
+            # one slot per bucket, one for +Inf, then the sum
+            counts = values[key] = [0] * (len(self.buckets) + 2)
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+
+class Gauge(Metric):
+    """
+    Read at scrape time from `collect()` -> {label values: value}.
+    `per_process` gauges (pool usage) are summed over live workers; the
+    others (queue sizes read from the database) are read once by whoever
+    serves the scrape.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels=(), per_process: bool = False, registry: Registry = REGISTRY):
+        super().__init__(name, help, labels, registry)
+        self.per_process = per_process
+        self.collect = None
+
+    def set_function(self, collect):
+        self.collect = collect
+
+    def read(self) -> dict:
+        if self.collect is None:
+            return {}
+        return {(self.name, tuple(labels)): value for labels, value in self.collect().items()}
+
+
+# --- Metrics -----------------------------------------------------------------
+
+HTTP_REQUESTS = Counter("http_requests_total", "Requests handled, by blueprint.", ("blueprint", "method", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "Request wall time, by blueprint.", ("blueprint",))
+DB_STATEMENTS = Counter("db_statements_total", "SQL statements run by requests, by blueprint.", ("blueprint",))
+DB_STATEMENT_SECONDS = Counter("db_statement_seconds_total", "Time in SQL statements, by blueprint.", ("blueprint",))
+DB_POOL_WAIT = Histogram("db_pool_checkout_seconds", "Time to get a connection from the pool.",
+                         buckets=POOL_WAIT_BUCKETS)
+DB_POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Checkouts that gave up waiting for a connection.")
+DB_POOL_CONNECTIONS = Gauge("db_pool_connections", "Pooled connections by state.", ("state",), per_process=True)
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Cache lookups (hit ratio = hit / all).", ("cache", "result"))
+EMAILS_QUEUED = Counter("emails_queued_total", "Messages added to the email outbox.")
+EMAILS_DELIVERED = Counter("emails_delivered_total", "Outbox delivery attempts by in-process senders.", ("result",))
+EMAIL_OUTBOX = Gauge("email_outbox_messages", "Messages in the email outbox by status.", ("status",))
+
+
+# --- Multiprocess (gunicorn) -------------------------------------------------
+# Each worker writes its snapshot to METRICS_DIR/<pid>.json every few seconds;
+# a scrape served by any worker sums the files. Counters of workers that have
+# exited stay in the sum (Prometheus counters must not go backwards) - clear
+# the directory when the service is (re)started.
+
+def _encode(values: dict) -> list:
+    return [[name, list(labels), value] for (name, labels), value in values.items()]
+
+
+def _decode(rows) -> dict:
+    return {(name, tuple(labels)): value for name, labels, value in rows}
+
+
+def write_snapshot(directory: str):
+    per_process = {}
+    for metric in REGISTRY.metrics.values():
+        if isinstance(metric, Gauge) and metric.per_process:
+            per_process.update(metric.read())
+    data = {"pid": os.getpid(), "values": _encode(REGISTRY.snapshot()), "gauges": _encode(per_process)}
+
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, os.path.join(directory, f"{os.getpid()}.json"))
+
+
+def read_snapshots(directory: str, gauge_max_age: float) -> tuple:
+    values, gauges = {}, {}
+    now = time.time()
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            age = now - os.path.getmtime(path)
+        except (OSError, ValueError):
+            continue  # being replaced / half written by an old version
+        for key, value in _decode(data["values"]).items():
+            _add(values, key, value)
+        if age <= gauge_max_age:  # a worker that stopped writing is gone
+            for key, value in _decode(data["gauges"]).items():
+                _add(gauges, key, value)
+    return values, gauges
+
+
+class SnapshotWriter:
+    """Background thread of one worker writing its snapshot to METRICS_DIR."""
+
+    def __init__(self, directory: str, interval: float):
+        self.directory = directory
+        self.interval = interval
+        self.pid = None
+
+    def ensure_running(self, app):
+        # Threads don't survive a fork (gunicorn --preload): start per worker
+        if self.pid == os.getpid():
+            return
+        self.pid = os.getpid()
+        REGISTRY.reset_after_fork()
+
+        def _loop():
+            with app.app_context():
+                while True:
+                    time.sleep(self.interval)
+                    try:
+                        write_snapshot(self.directory)
+                    except Exception:
+                        app.logger.exception("Metrics: could not write snapshot")
+                    finally:
+                        db.session.remove()
+
+        threading.Thread(target=_loop, name="metrics-writer", daemon=True).start()
+
+
+# --- Exposition --------------------------------------------------------------
+
+def _format_labels(names, values, extra=()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+def render(values: dict, gauges: dict) -> str:
+    by_metric = {}
+    for (name, labels), value in list(values.items()) + list(gauges.items()):
+        by_metric.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for metric in REGISTRY.metrics.values():
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for labels, value in sorted(by_metric.get(metric.name, ()), key=lambda item: item[0]):
+            if isinstance(metric, Histogram):
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (math.inf,), value[:-1]):
+                    cumulative += count
+                    le = _format_labels(metric.labels, labels, [("le", _format_number(float(bound)))])
+                    lines.append(f"{metric.name}_bucket{le} {cumulative}")
+                plain = _format_labels(metric.labels, labels)
+                lines.append(f"{metric.name}_sum{plain} {_format_number(value[-1])}")
+                lines.append(f"{metric.name}_count{plain} {cumulative}")
+            else:
+                lines.append(f"{metric.name}{_format_labels(metric.labels, labels)} {_format_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def exposition(app) -> str:
+    """All metrics in the Prometheus text format (needs an app context)."""
+    directory = app.config.get("METRICS_DIR")
+    if directory:
+        write_snapshot(directory)
+        values, gauges = read_snapshots(directory, gauge_max_age=3 * app.config["METRICS_FLUSH_SECONDS"])
+    else:
+        values = REGISTRY.snapshot()
+        gauges = {}
+        for metric in REGISTRY.metrics.values():
+            if isinstance(metric, Gauge) and metric.per_process:
+                gauges.update(metric.read())
+    for metric in REGISTRY.metrics.values():
+        if isinstance(metric, Gauge) and not metric.per_process:
+            try:
+                gauges.update(metric.read())
+            except Exception:
+                app.logger.exception("Metrics: gauge %s failed", metric.name)
+    return render(values, gauges)
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def start_metrics_server(app, bind: str):
+    """
+    Serve /metrics on its own address (e.g. 127.0.0.1:9100), away from the
+    public site. Under gunicorn only the first worker gets the port; with
+    METRICS_DIR set it reports for all of them.
+    """
+    from werkzeug.serving import make_server
+    from werkzeug.wrappers import Request, Response
+
+    host, _, port = bind.rpartition(":")
+
+    @Request.application
+    def metrics_app(req):
+        if req.path != "/metrics":
+            return Response("Not found", status=404)
+        with app.app_context():
+            try:
+                return Response(exposition(app), content_type=CONTENT_TYPE)
+            finally:
+                db.session.remove()
+
+    try:
+        server = make_server(host or "127.0.0.1", int(port), metrics_app)
+    except OSError as e:
+        app.logger.info("Metrics: %s not bound (%s); another worker serves it", bind, e)
+        return None
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    app.logger.info("Metrics: serving http://%s/metrics", bind)
+    return server
+
+
+# --- Wiring ------------------------------------------------------------------
+
+def _outbox_counts() -> dict:
+    from .outbox.models import EmailOutbox
+    rows = db.session.execute(db.select(EmailOutbox.status, func.count()).group_by(EmailOutbox.status))
+    return {(status,): count for status, count in rows}
+
+
+def init_metrics(app):
+    """
+    Request / database / cache / email metrics in the Prometheus text format.
+    /metrics is served on METRICS_BIND (separate address) and/or on the site
+    itself with an `Authorization: Bearer <METRICS_TOKEN>` header; with
+    neither set the metrics are still collected but not exposed.
+    """
+    if os.getenv("METRICS_ENABLED", "true").lower() != "true":
+        return
+
+    app.config["METRICS_DIR"] = os.getenv("METRICS_DIR") or None
+    app.config["METRICS_FLUSH_SECONDS"] = float(os.getenv("METRICS_FLUSH_SECONDS", FLUSH_SECONDS))
+    if app.config["METRICS_DIR"]:
+        os.makedirs(app.config["METRICS_DIR"], exist_ok=True)
+        writer = SnapshotWriter(app.config["METRICS_DIR"], app.config["METRICS_FLUSH_SECONDS"])
+        app.before_request(lambda: writer.ensure_running(app))
+
+    with app.app_context():
+        pool = db.engine.pool
+    if hasattr(pool, "checkedout"):
+        DB_POOL_CONNECTIONS.set_function(lambda: {("checked_out",): pool.checkedout(), ("idle",): pool.checkedin()})
+    EMAIL_OUTBOX.set_function(_outbox_counts)
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        started = g.pop("_metrics_started", None)
+        if started is None:
+            return response
+        blueprint = request.blueprint or "app"
+        HTTP_REQUESTS.inc(blueprint, request.method, str(response.status_code))
+        HTTP_LATENCY.observe(time.perf_counter() - started, blueprint)
+        stats = g.get("_request_stats")  # app.instrumentation, when enabled
+        if stats is not None and stats.sql_count:
+            DB_STATEMENTS.inc(blueprint, amount=stats.sql_count)
+            DB_STATEMENT_SECONDS.inc(blueprint, amount=stats.sql_seconds)
+        return response
+
+    token = os.getenv("METRICS_TOKEN", "")
+    if token:
+        @app.route("/metrics")
+        def metrics():
+            supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+            if not hmac.compare_digest(supplied.encode(), token.encode()):
+                abort(404)
+            return app.response_class(exposition(app), content_type=CONTENT_TYPE)
+
+    bind = os.getenv("METRICS_BIND", "")
+    if bind:
+        start_metrics_server(app, bind)
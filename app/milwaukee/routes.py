@@ -1,43 +1,120 @@
-﻿from flask import Blueprint, render_template
-from flask_login import login_required
+﻿from flask import render_template, request, jsonify, redirect, url_for, flash
+from flask_login import login_required, current_user
 
 from app.rent.models import Tool
+from app.rent.availability import free_units, parse_window
+from app.rent.pricing import quote_catalog
+from app.rent.cart import SESSION_KEY as CART_SESSION_KEY
+from app.rent.cart import CartError, get_cart, clear_cart, price_lines, check_availability, checkout
+from app.products.search import search_products, product_to_dict
+from app.catalog.versioning import catalog_cached
+from app.utils.query_budget import query_budget
+from . import bp
 
-milwaukee_bp = Blueprint("milwaukee", __name__, url_prefix="/milwaukee")
 
-
-@milwaukee_bp.route("/products")
+@bp.route("/products")
+@query_budget(4)
+@catalog_cached("products")
 def products():
-    return render_template("milwaukee/products.html")
+    q = (request.args.get("q") or "").strip()
+    sort = request.args.get("sort") or ("rank" if q else "part_asc")
+    page = request.args.get("page", 1, type=int)
+
+    # Only the matching page is rendered; filtering/sorting happens in SQL.
+    pagination = search_products(q, page=page, per_page=24, sort=sort)
+    return render_template(
+        "milwaukee/products.html",
+        products=pagination.items,
+        pagination=pagination,
+        q=q,
+        sort=sort,
+    )
+
+
+@bp.route("/products/search")
+@query_budget(2)
+def products_search():
+    q = (request.args.get("q") or "").strip()
+    sort = request.args.get("sort") or "rank"
+    page = request.args.get("page", 1, type=int)
+    per_page = request.args.get("per_page", 24, type=int)
+
+    pagination = search_products(q, page=page, per_page=per_page, sort=sort)
+    return jsonify({
+        "query": q,
+        "sort": sort,
+        "page": pagination.page,
+        "per_page": pagination.per_page,
+        "total": pagination.total,
+        "pages": pagination.pages,
+        "items": [product_to_dict(p) for p in pagination.items],
+    })
 
 
-@milwaukee_bp.route("/quote", methods=["GET", "POST"])
+@bp.route("/quote", methods=["GET", "POST"])
 def quote():
     return render_template("milwaukee/quote.html")
 
 
-@milwaukee_bp.route("/buy", methods=["GET", "POST"])
+@bp.route("/buy", methods=["GET", "POST"])
 def buy():
     return render_template("milwaukee/buy.html")
 
 
-@milwaukee_bp.route("/safety")
+@bp.route("/safety")
 def safety():
     return render_template("milwaukee/safety.html")
 
 
 # ✅ Support BOTH URLs: /tool_rent and /tool-rent
-@milwaukee_bp.route("/tool_rent")
-@milwaukee_bp.route("/tool-rent")
+@bp.route("/tool_rent")
+@bp.route("/tool-rent")
 @login_required
+@query_budget(3)
+@catalog_cached("tools", "rentals", session_keys=(CART_SESSION_KEY,), daily=True)
 def tool_rent():
     tools = Tool.query.order_by(Tool.id.desc()).all()
-    return render_template("milwaukee/tool_rent.html", tools=tools)
+    start_date, end_date = parse_window(request.args)
+    availability = free_units(start_date, end_date, tools)
+    return render_template(
+        "milwaukee/tool_rent.html",
+        tools=tools,
+        availability=availability,
+        quotes=quote_catalog(tools, start_date, end_date),
+        start_date=start_date,
+        end_date=end_date,
+    )
 
 
 # ✅ Support BOTH checkout URLs too
-@milwaukee_bp.route("/tool_rent/checkout", methods=["GET", "POST"])
-@milwaukee_bp.route("/tool-rent/checkout", methods=["GET", "POST"])
+@bp.route("/tool_rent/checkout", methods=["GET", "POST"])
+@bp.route("/tool-rent/checkout", methods=["GET", "POST"])
 @login_required
 def tool_rent_checkout():
-    return render_template("milwaukee/tool_rent_checkout.html")
+    lines = get_cart()
+
+    if request.method == "POST":
+        try:
+            order = checkout(current_user.id, lines)
+        except CartError as e:
+            flash(str(e), "danger")
+            return redirect(url_for("milwaukee.tool_rent_checkout"))
+
+        clear_cart()
+        flash("Rental request created. Please choose payment method.", "success")
+        return redirect(url_for("payments.checkout", order_id=order.id))
+
+    try:
+        priced = price_lines(lines)
+        error = None
+    except CartError as e:
+        priced, error = [], str(e)
+
+    shortages = check_availability(lines, {tool.id: tool for _, tool, _ in priced}) if priced else {}
+    return render_template(
+        "milwaukee/tool_rent_checkout.html",
+        lines=priced,
+        total=sum(q.total for _, _, q in priced),
+        shortages=shortages,
+        error=error,
+    )
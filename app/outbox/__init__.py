@@ -0,0 +1 @@
+# Email outbox (queued mail + background sender)
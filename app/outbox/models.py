@@ -0,0 +1,30 @@
+from datetime import datetime
+from ..extensions import db
+
+
+class EmailOutbox(db.Model):
+    # The sender polls (status, next_attempt_at) for due messages
+    __table_args__ = (db.Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    to_email = db.Column(db.String(180), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+
+    # Optional single attachment (e.g. invite.ics)
+    attachment_name = db.Column(db.String(120), nullable=True)
+    attachment_type = db.Column(db.String(80), nullable=True)
+    attachment_data = db.Column(db.Text, nullable=True)
+
+    status = db.Column(db.String(20), nullable=False, default="queued")  # queued/sending/sent/failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # Set while a sender owns the row, so parallel senders never double-send
+    claim_token = db.Column(db.String(32), nullable=True, index=True)
+    claimed_at = db.Column(db.DateTime, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
@@ -0,0 +1,270 @@
+import smtplib
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import event, insert, update
+
+from ..extensions import db
+from ..metrics import EMAILS_DELIVERED, EMAILS_QUEUED
+from .models import EmailOutbox
+
+BATCH_SIZE = 50
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 60
+BACKOFF_MAX_SECONDS = 3600
+# A "sending" row older than this belongs to a sender that died; take it back
+STALE_CLAIM_SECONDS = 600
+# Rows per executemany INSERT in enqueue_many
+ENQUEUE_CHUNK_SIZE = 500
+# Seconds between full batches unless OUTBOX_BATCH_PAUSE says otherwise
+DEFAULT_BATCH_PAUSE = 1.0
+
+# session.info key: messages queued in the current transaction, not yet counted
+_QUEUED = "outbox_queued"
+
+
+def _count_on_commit(session):
+    queued = session.info.pop(_QUEUED, 0)
+    if queued:
+        EMAILS_QUEUED.inc(amount=queued)
+
+
+def _forget_on_rollback(session):
+    session.info.pop(_QUEUED, None)
+
+
+def _count_queued(count: int):
+    """EMAILS_QUEUED moves when the transaction commits; a rollback queued nothing."""
+    if not event.contains(db.session, "after_commit", _count_on_commit):
+        event.listen(db.session, "after_commit", _count_on_commit)
+        event.listen(db.session, "after_rollback", _forget_on_rollback)
+    db.session.info[_QUEUED] = db.session.info.get(_QUEUED, 0) + count
+
+
+def enqueue_email(to_email: str, subject: str, body: str, attachment=None, commit: bool = True) -> EmailOutbox:
+    """
+    Queue one message. This is the only thing a web request does - a single
+    INSERT, no SMTP. `attachment` is (filename, content_type, text).
+    """
+    row = EmailOutbox(to_email=to_email, subject=subject, body=body)
+    if attachment:
+        row.attachment_name, row.attachment_type, row.attachment_data = attachment
+    db.session.add(row)
+    _count_queued(1)
+    if commit:
+        db.session.commit()
+    return row
+
+
+def enqueue_many(messages, commit: bool = True) -> int:
+    """
+    Bulk version of enqueue_email for fan-outs (training invites etc.):
+    `messages` are dicts with to_email / subject / body and optionally
+    attachment_name / attachment_type / attachment_data. Chunked executemany.
+    """
+    now = datetime.utcnow()
+    count = 0
+    chunk = []
+    for m in messages:
+        chunk.append({
+            "attachment_name": None,
+            "attachment_type": None,
+            "attachment_data": None,
+            **m,
+            "status": "queued",
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now,
+        })
+        if len(chunk) >= ENQUEUE_CHUNK_SIZE:
+            db.session.execute(insert(EmailOutbox), chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        db.session.execute(insert(EmailOutbox), chunk)
+        count += len(chunk)
+    _count_queued(count)
+    if commit:
+        db.session.commit()
+    return count
+
+
+def backoff_seconds(attempts: int) -> int:
+    return min(BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0), BACKOFF_MAX_SECONDS)
+
+
+def claim_batch(batch_size: int = BATCH_SIZE) -> list:
+    """Atomically mark up to `batch_size` due messages as ours and return them."""
+    now = datetime.utcnow()
+    token = uuid.uuid4().hex
+
+    is_due = db.or_(
+        db.and_(EmailOutbox.status == "queued", EmailOutbox.next_attempt_at <= now),
+        db.and_(
+            EmailOutbox.status == "sending",
+            EmailOutbox.claimed_at < now - timedelta(seconds=STALE_CLAIM_SECONDS),
+        ),
+    )
+    due = (
+        db.select(EmailOutbox.id)
+        .where(is_due)
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+        .limit(batch_size)
+        .scalar_subquery()
+    )
+    db.session.execute(
+        update(EmailOutbox)
+        # Checked again on the row itself: under READ COMMITTED a concurrent
+        # sender may pick the same ids; after waiting for its row lock the
+        # re-evaluated condition skips rows it has just claimed
+        .where(EmailOutbox.id.in_(due), is_due)
+        .values(status="sending", claim_token=token, claimed_at=now),
+        execution_options={"synchronize_session": False},
+    )
+    db.session.commit()
+
+    return db.session.scalars(
+        db.select(EmailOutbox).where(EmailOutbox.claim_token == token).order_by(EmailOutbox.id)
+    ).all()
+
+
+def build_message(row: EmailOutbox) -> Message:
+    msg = Message(subject=row.subject, recipients=[row.to_email], body=row.body)
+    if row.attachment_data is not None:
+        msg.attach(row.attachment_name or "attachment", row.attachment_type or "application/octet-stream",
+                   row.attachment_data)
+    return msg
+
+
+def _mark_failed(row: EmailOutbox, error: Exception, now: datetime):
+    row.attempts += 1
+    row.last_error = f"{type(error).__name__}: {error}"[:2000]
+    row.claim_token = None
+    row.claimed_at = None
+    if row.attempts >= MAX_ATTEMPTS:
+        row.status = "failed"
+    else:
+        row.status = "queued"
+        row.next_attempt_at = now + timedelta(seconds=backoff_seconds(row.attempts))
+
+
+def mail_configured() -> bool:
+    mail = current_app.extensions.get("mail")
+    if mail is None:
+        return False
+    return bool(mail.suppress or current_app.config.get("MAIL_SERVER"))
+
+
+def send_batch(batch_size: int = BATCH_SIZE) -> tuple:
+    """
+    Claim one batch and deliver it over a single SMTP connection.
+    Returns (sent, failed).
+    """
+    rows = claim_batch(batch_size)
+    if not rows:
+        return 0, 0
+
+    mail = current_app.extensions["mail"]
+    sent = failed = 0
+    now = datetime.utcnow()
+
+    try:
+        with mail.connect() as conn:
+            for i, row in enumerate(rows):
+                try:
+                    conn.send(build_message(row))
+                except smtplib.SMTPServerDisconnected as e:
+                    # Connection is gone: this and the rest of the batch retry later
+                    for rest in rows[i:]:
+                        _mark_failed(rest, e, now)
+                        failed += 1
+                    break
+                except Exception as e:
+                    _mark_failed(row, e, now)
+                    failed += 1
+                    continue
+
+                row.status = "sent"
+                row.sent_at = datetime.utcnow()
+                row.claim_token = None
+                row.last_error = None
+                sent += 1
+    except Exception as e:
+        # Could not connect / log in: nothing from this batch went out
+        current_app.logger.warning("Outbox: SMTP connection failed: %s", e)
+        for row in rows:
+            if row.status == "sending":
+                _mark_failed(row, e, now)
+                failed += 1
+
+    db.session.commit()
+    EMAILS_DELIVERED.inc("sent", amount=sent)
+    EMAILS_DELIVERED.inc("failed", amount=failed)
+    return sent, failed
+
+
+def run_sender(batch_size: int = BATCH_SIZE, poll_interval: float = 5.0, once: bool = False, stop_event=None,
+               batch_pause: float = None):
+    """
+    Drain the outbox in batches; sleep when empty. `once` = drain and return.
+    `batch_pause` throttles big fan-outs: seconds to wait between full batches
+    (default OUTBOX_BATCH_PAUSE), so a few hundred invites don't hit the SMTP
+    relay's rate limit at once. 0 turns throttling off.
+    """
+    if batch_pause is None:
+        batch_pause = current_app.config.get("OUTBOX_BATCH_PAUSE", DEFAULT_BATCH_PAUSE)
+    totals = [0, 0]
+    if not mail_configured():
+        current_app.logger.warning("Outbox: MAIL not configured; messages stay queued.")
+        return tuple(totals)
+
+    while stop_event is None or not stop_event.is_set():
+        sent, failed = send_batch(batch_size)
+        totals[0] += sent
+        totals[1] += failed
+        if sent or failed:
+            current_app.logger.info("Outbox: sent %s, failed %s", sent, failed)
+            # A full batch means more are waiting: pause before the next one
+            if batch_pause > 0 and sent + failed >= batch_size:
+                if stop_event is not None:
+                    stop_event.wait(batch_pause)
+                else:
+                    time.sleep(batch_pause)
+            continue
+        if once:
+            break
+        if stop_event is not None:
+            stop_event.wait(poll_interval)
+        else:
+            time.sleep(poll_interval)
+    return tuple(totals)
+
+
+def start_background_sender(app, batch_size: int = BATCH_SIZE, poll_interval: float = 5.0, batch_pause: float = None):
+    """
+    In-process alternative to `python send_outbox.py` (single-process
+    deployments / dev). Claims are atomic, so it is safe next to a CLI sender.
+    """
+    stop_event = threading.Event()
+
+    def _loop():
+        with app.app_context():
+            while not stop_event.is_set():
+                try:
+                    run_sender(batch_size, poll_interval, stop_event=stop_event, batch_pause=batch_pause)
+                except Exception:
+                    app.logger.exception("Outbox: background sender crashed; restarting")
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+                # MAIL not configured -> run_sender returns at once; don't spin
+                stop_event.wait(poll_interval)
+
+    thread = threading.Thread(target=_loop, name="email-outbox", daemon=True)
+    thread.start()
+    app.extensions["outbox_sender"] = (thread, stop_event)
+    return stop_event
@@ -2,6 +2,12 @@
 from ..extensions import db
 
 class Order(db.Model):
+    # Invoices page: a customer's orders newest first, optionally by status
+    __table_args__ = (
+        db.Index("ix_order_user_id_id", "user_id", "id"),
+        db.Index("ix_order_user_status_id", "user_id", "status", "id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     total_amount = db.Column(db.Integer, nullable=False)  # MNT int
@@ -10,7 +16,7 @@ class Order(db.Model):
 
 class Payment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False, index=True)
     method = db.Column(db.String(20), nullable=True)  # qpay/bank
     amount = db.Column(db.Integer, nullable=False)  # MNT int
     status = db.Column(db.String(20), default='unpaid', nullable=False)  # unpaid/paid/failed
@@ -0,0 +1,370 @@
+import csv
+import re
+import time
+from collections import Counter, defaultdict, namedtuple
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import bindparam, update
+
+from ..extensions import db
+from ..ledger import balances as ledger
+from ..utils.locking import select_for_update
+from .models import Order, Payment
+
+# Rows per IN (...) check / executemany UPDATE
+CHUNK_SIZE = 500
+# Shorter tokens in free text are too likely to hit a reference by accident
+MIN_TOKEN_LENGTH = 6
+
+StatementLine = namedtuple("StatementLine", "line_no date amount reference description")
+Candidate = namedtuple("Candidate", "payment_id order_id user_id amount reference")
+Issue = namedtuple("Issue", "line outcome payment_ids detail")
+ReconcileResult = namedtuple(
+    "ReconcileResult",
+    "lines credits matched applied unmatched ambiguous amount_mismatch duplicates issues seconds",
+)
+
+
+class StatementError(ValueError):
+    pass
+
+
+# --- Parsing -----------------------------------------------------------------
+
+def normalize_reference(value) -> str:
+    return re.sub(r"[^0-9A-Z]", "", str(value or "").upper())
+
+
+def parse_amount(value) -> int:
+    """'1 234 567,00' / '1,234,567.00' / '-500' -> int MNT."""
+    s = re.sub(r"[\s ']", "", str(value or ""))
+    if not s:
+        return 0
+    if "," in s and "." in s:
+        s = s.replace(",", "") if s.rfind(".") > s.rfind(",") else s.replace(".", "").replace(",", ".")
+    elif "," in s:
+        # "1234,56" is a decimal comma; "1,234,567" groups thousands
+        s = s.replace(",", ".") if re.search(r",\d{1,2}$", s) else s.replace(",", "")
+    try:
+        return int(Decimal(s).quantize(Decimal(1)))
+    except InvalidOperation:
+        raise StatementError(f"Not an amount: {value!r}")
+
+
+def parse_date(value):
+    s = str(value or "").strip()
+    for fmt in ("%Y-%m-%d", "%Y.%m.%d", "%Y/%m/%d", "%d.%m.%Y", "%d/%m/%Y", "%y%m%d"):
+        try:
+            return datetime.strptime(s[:10], fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+class _Prepend:
+    """Put already-read text back in front of a stream (read() / iteration)."""
+
+    def __init__(self, head, stream):
+        self.head = head
+        self.stream = stream
+
+    def read(self, size=-1):
+        head, self.head = self.head, ""
+        if size is None or size < 0:
+            return head + self.stream.read()
+        return head + self.stream.read(max(size - len(head), 0))
+
+    def readline(self):
+        head, self.head = self.head, ""
+        if "\n" in head:
+            line, rest = head.split("\n", 1)
+            self.head = rest
+            return line + "\n"
+        return head + self.stream.readline()
+
+    def __iter__(self):
+        while True:
+            line = self.readline()
+            if not line:
+                return
+            yield line
+
+
+def _chain(sample, stream):
+    buffered = sample.splitlines(keepends=True)
+    # The sample may end mid-line: glue it to the rest of that line
+    if buffered and not buffered[-1].endswith(("\n", "\r")):
+        buffered[-1] += stream.readline()
+    yield from buffered
+    yield from stream
+
+
+CSV_COLUMNS = {
+    "date": ("date", "value date", "booking date", "transaction date", "огноо"),
+    "amount": ("amount", "дүн"),
+    "credit": ("credit", "кредит", "орлого"),
+    "debit": ("debit", "дебит", "зарлага"),
+    "reference": ("reference", "ref", "payment reference", "end to end id"),
+    "description": ("description", "details", "narrative", "гүйлгээний утга", "утга"),
+}
+
+
+def iter_csv(stream):
+    """StatementLines from a CSV export (header names matched case-insensitively)."""
+    sample = stream.read(4096)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(_chain(sample, stream), dialect)
+
+    header = [h.strip().lower() for h in next(reader, [])]
+    index = {}
+    for field, names in CSV_COLUMNS.items():
+        for i, h in enumerate(header):
+            if h in names:
+                index[field] = i
+                break
+    if "amount" not in index and "credit" not in index:
+        raise StatementError("The statement needs an Amount or Credit column.")
+    if "reference" not in index and "description" not in index:
+        raise StatementError("The statement needs a Reference or Description column.")
+
+    def cell(row, field):
+        i = index.get(field)
+        return row[i] if i is not None and i < len(row) else ""
+
+    for line_no, row in enumerate(reader, start=2):
+        if not any(c.strip() for c in row):
+            continue
+        if "amount" in index:
+            amount = parse_amount(cell(row, "amount"))
+        else:
+            amount = parse_amount(cell(row, "credit")) - parse_amount(cell(row, "debit"))
+        yield StatementLine(line_no, parse_date(cell(row, "date")), amount,
+                            cell(row, "reference").strip(), cell(row, "description").strip())
+
+
+_MT940_61 = re.compile(r"^:61:(\d{6})(\d{4})?(R?[CD])[A-Z]?(\d+(?:,\d*)?)(?:[A-Z]\w{3})?(.*)$")
+
+
+def iter_mt940(stream):
+    """
+    StatementLines from an MT940 file: one per :61: transaction, with the
+    :86: information lines that follow it as the description.
+    """
+    pending = None
+    info = []
+
+    def emit():
+        line_no, value_date, amount, reference = pending
+        return StatementLine(line_no, value_date, amount, reference, " ".join(info).strip())
+
+    for line_no, raw in enumerate(stream, start=1):
+        line = raw.rstrip("\r\n")
+        if line.startswith(":61:"):
+            if pending:
+                yield emit()
+            m = _MT940_61.match(line)
+            if not m:
+                raise StatementError(f"Line {line_no}: unreadable :61: field")
+            amount = parse_amount(m.group(4))
+            if m.group(3) in ("D", "RC"):
+                amount = -amount
+            # Customer reference is what precedes "//" (the bank's own reference)
+            reference = m.group(5).split("//", 1)[0]
+            pending = (line_no, parse_date(m.group(1)), amount, reference)
+            info = []
+        elif line.startswith(":86:") and pending:
+            info.append(line[4:])
+        elif line.startswith(":") or line.startswith("-}"):
+            if pending:
+                yield emit()
+            pending = None
+            info = []
+        elif pending and info:
+            info.append(line)  # :86: continuation
+    if pending:
+        yield emit()
+
+
+def iter_statement(stream, fmt: str = None):
+    """CSV or MT940 (detected from the first characters when `fmt` is None)."""
+    if fmt is None:
+        head = stream.read(64)
+        fmt = "mt940" if head.lstrip().startswith((":20:", "{1:", ":940:")) else "csv"
+        stream = _Prepend(head, stream)
+    if fmt == "mt940":
+        return iter_mt940(stream)
+    if fmt == "csv":
+        return iter_csv(stream)
+    raise StatementError(f"Unknown statement format: {fmt}")
+
+
+# --- Matching ----------------------------------------------------------------
+
+class PaymentIndex:
+    """
+    Unpaid payments keyed by (normalized bank_reference, amount), plus the
+    references alone so a right reference with a wrong amount is reported
+    as such. Built with one query; every statement line is a few dict hits.
+    """
+
+    def __init__(self):
+        self.by_key = defaultdict(list)
+        self.references = set()
+        self.by_reference = defaultdict(list)
+
+    @classmethod
+    def load(cls):
+        index = cls()
+        rows = db.session.execute(
+            db.select(Payment.id, Payment.order_id, Order.user_id, Payment.amount, Payment.bank_reference)
+            .join(Order, Order.id == Payment.order_id)
+            .where(Payment.status == "unpaid", Payment.bank_reference.isnot(None))
+        )
+        for row in rows:
+            reference = normalize_reference(row.bank_reference)
+            if not reference:
+                continue
+            candidate = Candidate(row.id, row.order_id, row.user_id, row.amount, reference)
+            index.by_key[(reference, row.amount)].append(candidate)
+            index.by_reference[reference].append(candidate)
+            index.references.add(reference)
+        return index
+
+    def references_in(self, line: StatementLine) -> set:
+        tokens = {normalize_reference(line.reference)}
+        for text in (line.reference, line.description):
+            # Words of the text; "-", "/" and "." stay inside (INV-00012345)
+            tokens.update(normalize_reference(t) for t in re.split(r"[^0-9A-Za-z./-]+", text or "")
+                          if len(t) >= MIN_TOKEN_LENGTH)
+        return {t for t in tokens if t and t in self.references}
+
+    def match(self, line: StatementLine) -> tuple:
+        """(outcome, [Candidate])"""
+        references = self.references_in(line)
+        if not references:
+            return "unmatched", []
+        candidates = [c for r in references for c in self.by_key.get((r, line.amount), ())]
+        if len(candidates) == 1:
+            return "matched", candidates
+        if candidates:
+            return "ambiguous", candidates
+        return "amount_mismatch", [c for r in references for c in self.by_reference[r]]
+
+
+def apply_matches(matches) -> int:
+    """
+    Mark the matched payments paid (and their pending orders paid) with
+    executemany UPDATEs, and post the payments to the customer ledger.
+    Payments paid since the index was built are left alone: the re-check
+    runs under the write lock, so the rows posted are exactly the rows
+    updated. Returns how many were applied; the caller commits.
+    """
+    conn = db.session.connection()
+    ids = [c.payment_id for c in matches]
+    still_unpaid = set()
+    for i in range(0, len(ids), CHUNK_SIZE):
+        still_unpaid.update(row.id for row in select_for_update(
+            db.select(Payment.id).where(Payment.id.in_(ids[i:i + CHUNK_SIZE]), Payment.status == "unpaid")
+        ))
+    matches = [c for c in matches if c.payment_id in still_unpaid]
+    if not matches:
+        return 0
+
+    payments = Payment.__table__
+    orders = Order.__table__
+    pay = (
+        update(payments)
+        .where(payments.c.id == bindparam("pid"), payments.c.status == "unpaid")
+        .values(status="paid", method="bank")
+    )
+    close = update(orders).where(orders.c.id == bindparam("oid"), orders.c.status == "pending").values(status="paid")
+    for i in range(0, len(matches), CHUNK_SIZE):
+        chunk = matches[i:i + CHUNK_SIZE]
+        conn.execute(pay, [{"pid": c.payment_id} for c in chunk])
+        conn.execute(close, [{"oid": c.order_id} for c in chunk])
+
+    # Core UPDATEs skip the ORM flush, so the ledger is posted here
+    ledger.post([
+        ledger.Posting(c.user_id, "payment", -c.amount, order_id=c.order_id, payment_id=c.payment_id,
+                       note=f"bank transfer {c.reference}")
+        for c in matches
+    ], conn)
+    return len(matches)
+
+
+def reconcile(lines, dry_run: bool = False, index: PaymentIndex = None) -> ReconcileResult:
+    """
+    Match statement lines (credits only) to unpaid payments and apply the
+    unique matches in bulk. Everything else is returned as an Issue for the
+    report. `lines` is any iterable (the parsers stream the file).
+    """
+    started = time.perf_counter()
+    index = index or PaymentIndex.load()
+    counts = Counter()
+    issues = []
+    matched = {}  # payment_id -> (Candidate, line)
+
+    for line in lines:
+        counts["lines"] += 1
+        if line.amount <= 0:
+            continue
+        counts["credits"] += 1
+        outcome, candidates = index.match(line)
+        if outcome == "matched":
+            candidate = candidates[0]
+            if candidate.payment_id in matched:
+                outcome = "duplicate"
+                detail = f"payment already matched by line {matched[candidate.payment_id][1].line_no}"
+            else:
+                matched[candidate.payment_id] = (candidate, line)
+        if outcome != "matched":
+            if outcome == "ambiguous":
+                detail = f"{len(candidates)} unpaid payments with this reference and amount"
+            elif outcome == "amount_mismatch":
+                amounts = sorted({c.amount for c in candidates})
+                detail = f"reference found, expected amount {', '.join(f'{a:,}' for a in amounts)}"
+            elif outcome == "unmatched":
+                detail = "no unpaid payment with this reference"
+            issues.append(Issue(line, outcome, [c.payment_id for c in candidates], detail))
+        counts[outcome] += 1
+
+    applied = 0 if dry_run else apply_matches([c for c, _ in matched.values()])
+    if not dry_run:
+        db.session.commit()
+
+    return ReconcileResult(
+        lines=counts["lines"],
+        credits=counts["credits"],
+        matched=counts["matched"],
+        applied=applied,
+        unmatched=counts["unmatched"],
+        ambiguous=counts["ambiguous"],
+        amount_mismatch=counts["amount_mismatch"],
+        duplicates=counts["duplicate"],
+        issues=issues,
+        seconds=time.perf_counter() - started,
+    )
+
+
+REPORT_HEADER = ("line", "date", "amount", "reference", "description", "outcome", "payment_ids", "detail")
+
+
+def write_report(issues, stream):
+    writer = csv.writer(stream)
+    writer.writerow(REPORT_HEADER)
+    for issue in issues:
+        line = issue.line
+        writer.writerow([
+            line.line_no,
+            line.date.isoformat() if isinstance(line.date, date) else "",
+            line.amount,
+            line.reference,
+            line.description,
+            issue.outcome,
+            " ".join(str(i) for i in issue.payment_ids),
+            issue.detail,
+        ])
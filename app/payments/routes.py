@@ -1,15 +1,68 @@
-﻿from flask import render_template
+﻿import io
+
+from flask import abort, flash, render_template
 from flask_login import login_required, current_user
 
+from ..rent.models import Tool, RentalRequest
+from ..utils.forms import BankStatementForm
+from ..utils.query_budget import query_budget
 from .models import Order, Payment
+from .reconcile import StatementError, iter_statement, reconcile, write_report
 from . import bp
 
+# Problem lines shown on the page; the CSV report has all of them
+REPORT_PREVIEW_LINES = 200
+
 @bp.route('/checkout/<int:order_id>')
 @login_required
+@query_budget(3)
 def checkout(order_id):
     order = Order.query.get_or_404(order_id)
     if order.user_id != current_user.id:
         return "Forbidden", 403
 
     payment = Payment.query.filter_by(order_id=order.id).first()
-    return render_template('payments/checkout.html', order=order, payment=payment)
+    rentals = (
+        RentalRequest.query.join(Tool, Tool.id == RentalRequest.tool_id)
+        .add_columns(Tool.name)
+        .filter(RentalRequest.order_id == order.id)
+        .all()
+    )
+    return render_template('payments/checkout.html', order=order, payment=payment, rentals=rentals)
+
+
+@bp.route('/admin/bank-reconciliation', methods=['GET', 'POST'])
+@login_required
+def bank_reconciliation():
+    if not current_user.is_admin:
+        abort(403)
+
+    form = BankStatementForm()
+    result = None
+    if form.validate_on_submit():
+        # Parsed line by line straight from the upload stream
+        stream = io.TextIOWrapper(form.statement.data.stream, encoding="utf-8-sig", errors="replace", newline="")
+        try:
+            result = reconcile(iter_statement(stream), dry_run=form.dry_run.data)
+        except StatementError as e:
+            flash(f"Could not read the statement: {e}", "danger")
+        else:
+            if form.download_report.data:
+                report = io.StringIO()
+                write_report(result.issues, report)
+                return report.getvalue(), 200, {
+                    "Content-Type": "text/csv; charset=utf-8",
+                    "Content-Disposition": "attachment; filename=reconciliation-report.csv",
+                }
+            flash(
+                f"{'Dry run: ' if form.dry_run.data else ''}{result.matched} of {result.credits} credit line(s) matched, "
+                f"{result.applied} payment(s) marked paid.",
+                "success",
+            )
+
+    return render_template(
+        'payments/reconcile.html',
+        form=form,
+        result=result,
+        preview=result.issues[:REPORT_PREVIEW_LINES] if result else [],
+    )
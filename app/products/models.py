@@ -11,4 +11,9 @@ class Product(db.Model):
 
     unit_price_mnt = db.Column(db.Integer, nullable=False)  # store MNT as int
 
+    # sha1 of the normalized feed row; seed_products skips rows whose hash is unchanged
+    content_hash = db.Column(db.String(40), nullable=True)
+    # False = dropped from the supplier feed (soft delete, kept for order history)
+    is_active = db.Column(db.Boolean, nullable=False, default=True, server_default=db.true())
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,175 @@
+import re
+
+from flask import current_app
+from sqlalchemy import column, func, literal_column, or_, table, text
+
+from ..extensions import db
+from .models import Product
+
+
+# FTS5 index over product.part_number / product.description.
+# It is an "external content" table: the text lives in `product`, the index
+# only stores tokens, and the triggers below keep it in sync with every
+# INSERT / UPDATE / DELETE (ORM writes and the seeders' bulk writes alike).
+FTS_TABLE = "product_fts"
+
+FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS product_fts USING fts5(
+        part_number,
+        description,
+        content='product',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS product_fts_ai AFTER INSERT ON product BEGIN
+        INSERT INTO product_fts(rowid, part_number, description)
+        VALUES (new.id, new.part_number, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS product_fts_ad AFTER DELETE ON product BEGIN
+        INSERT INTO product_fts(product_fts, rowid, part_number, description)
+        VALUES ('delete', old.id, old.part_number, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS product_fts_au AFTER UPDATE OF part_number, description ON product BEGIN
+        INSERT INTO product_fts(product_fts, rowid, part_number, description)
+        VALUES ('delete', old.id, old.part_number, old.description);
+        INSERT INTO product_fts(rowid, part_number, description)
+        VALUES (new.id, new.part_number, new.description);
+    END
+    """,
+]
+
+FTS_DROP = [
+    "DROP TRIGGER IF EXISTS product_fts_au",
+    "DROP TRIGGER IF EXISTS product_fts_ad",
+    "DROP TRIGGER IF EXISTS product_fts_ai",
+    "DROP TABLE IF EXISTS product_fts",
+]
+
+FTS_REBUILD = "INSERT INTO product_fts(product_fts) VALUES ('rebuild')"
+
+# Part number hits should outrank description hits.
+RANK_WEIGHTS = (10.0, 1.0)
+
+SORTS = {
+    "part_asc": (Product.part_number.asc(),),
+    "part_desc": (Product.part_number.desc(),),
+    "price_asc": (Product.unit_price_mnt.asc(), Product.part_number.asc()),
+    "price_desc": (Product.unit_price_mnt.desc(), Product.part_number.asc()),
+}
+
+MAX_PER_PAGE = 100
+
+_fts = table(FTS_TABLE, column("rowid"))
+_fts_ref = literal_column(FTS_TABLE)
+
+
+def _is_sqlite() -> bool:
+    return db.engine.dialect.name == "sqlite"
+
+
+def ensure_search_index(rebuild: bool = False) -> bool:
+    """
+    Create the FTS5 table + triggers if missing (SQLite only).
+    Safe to call on every seed run. Returns True when the index is usable.
+    """
+    if not _is_sqlite():
+        return False
+
+    with db.engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type='table' AND name=:name"),
+            {"name": FTS_TABLE},
+        ).first()
+        for stmt in FTS_DDL:
+            conn.execute(text(stmt))
+        if rebuild or not exists:
+            conn.execute(text(FTS_REBUILD))
+
+    current_app.extensions["product_search_fts"] = True
+    return True
+
+
+def has_search_index() -> bool:
+    """Cached per app: does this database have the FTS5 index?"""
+    cached = current_app.extensions.get("product_search_fts")
+    if cached is not None:
+        return cached
+
+    available = False
+    if _is_sqlite():
+        available = db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type='table' AND name=:name"),
+            {"name": FTS_TABLE},
+        ).first() is not None
+
+    current_app.extensions["product_search_fts"] = available
+    return available
+
+
+def init_product_search(app):
+    """Probe for the FTS index at startup, so no request pays for (or is budgeted with) the lookup."""
+    with app.app_context():
+        try:
+            has_search_index()
+        finally:
+            db.session.remove()
+
+
+def _tokens(query: str):
+    return re.findall(r"\w+", query or "")
+
+
+def build_match_expression(query: str) -> str:
+    """
+    "48-22 trimmer" -> '"48"* "22"* "trimmer"*'
+    Every token must match (implicit AND) and is treated as a prefix,
+    so users can type partial part numbers.
+    """
+    return " ".join(f'"{tok}"*' for tok in _tokens(query))
+
+
+def search_statement(query: str = "", sort: str = "rank"):
+    """SELECT for the matching products, ranked (or sorted) but not paginated."""
+    stmt = db.select(Product).where(Product.is_active.is_(True))
+    tokens = _tokens(query)
+
+    if tokens and has_search_index():
+        stmt = stmt.join(_fts, _fts.c.rowid == Product.id).where(
+            _fts_ref.op("MATCH")(build_match_expression(query))
+        )
+        if sort not in SORTS:
+            return stmt.order_by(func.bm25(_fts_ref, *RANK_WEIGHTS), Product.part_number.asc())
+    elif tokens:
+        for tok in tokens:
+            like = f"%{tok}%"
+            stmt = stmt.where(or_(Product.part_number.ilike(like), Product.description.ilike(like)))
+
+    return stmt.order_by(*SORTS.get(sort, SORTS["part_asc"]))
+
+
+def search_products(query: str = "", page: int = 1, per_page: int = 24, sort: str = "rank"):
+    """Ranked, paginated product search. Returns a Flask-SQLAlchemy Pagination."""
+    per_page = max(1, min(per_page, MAX_PER_PAGE))
+    return db.paginate(
+        search_statement(query, sort),
+        page=max(page, 1),
+        per_page=per_page,
+        error_out=False,
+    )
+
+
+def product_to_dict(p: Product) -> dict:
+    return {
+        "id": p.id,
+        "part_number": p.part_number,
+        "description": p.description,
+        "uom": p.uom,
+        "unit_price_mnt": p.unit_price_mnt,
+    }
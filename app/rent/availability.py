@@ -0,0 +1,111 @@
+from collections import defaultdict
+from datetime import date, timedelta
+
+from sqlalchemy import or_
+
+from ..extensions import db
+from ..payments.models import Order
+from .models import Tool, RentalRequest
+
+# Orders in these states no longer hold stock
+RELEASED_STATUSES = ("cancelled",)
+
+# Above this many tools, scanning the date window for everyone is cheaper
+# than a huge IN (...) list; extra rows are simply ignored.
+IN_FILTER_LIMIT = 100
+
+# Longest ?start=..&end= window a request may ask about; longer ones are cut
+MAX_WINDOW_DAYS = 366
+
+
+def overlapping_rentals(start_date: date, end_date: date, tool_ids=None):
+    """
+    (tool_id, start_date, end_date, quantity) for every rental that holds
+    stock on at least one day of [start_date, end_date].
+    One indexed range query, no matter how many tools are asked about.
+    """
+    stmt = (
+        db.select(RentalRequest.tool_id, RentalRequest.start_date, RentalRequest.end_date, RentalRequest.quantity)
+        .outerjoin(Order, Order.id == RentalRequest.order_id)
+        .where(
+            RentalRequest.end_date >= start_date,
+            RentalRequest.start_date <= end_date,
+            or_(Order.id.is_(None), Order.status.notin_(RELEASED_STATUSES)),
+        )
+    )
+    if tool_ids is not None:
+        stmt = stmt.where(RentalRequest.tool_id.in_(list(tool_ids)))
+    return db.session.execute(stmt).all()
+
+
+def booked_peak(start_date: date, end_date: date, tool_ids=None) -> dict:
+    """
+    tool_id -> the highest number of units booked on any single day in the
+    window. Sweep line over start/end events, so it's O(r log r) in the
+    overlapping rentals only.
+    """
+    events = defaultdict(lambda: defaultdict(int))
+    for tool_id, r_start, r_end, qty in overlapping_rentals(start_date, end_date, tool_ids):
+        events[tool_id][max(r_start, start_date)] += qty
+        # Rentals running past the window never release inside it
+        if r_end < end_date:
+            events[tool_id][r_end + timedelta(days=1)] -= qty
+
+    peaks = {}
+    for tool_id, deltas in events.items():
+        running = peak = 0
+        for day in sorted(deltas):
+            running += deltas[day]
+            peak = max(peak, running)
+        peaks[tool_id] = peak
+    return peaks
+
+
+def free_units(start_date: date, end_date: date, tools) -> dict:
+    """tool_id -> units that can still be rented for the whole window."""
+    tools = list(tools)
+    tool_ids = [t.id for t in tools] if len(tools) <= IN_FILTER_LIMIT else None
+    peaks = booked_peak(start_date, end_date, tool_ids)
+    return {t.id: max((t.available_qty or 0) - peaks.get(t.id, 0), 0) for t in tools}
+
+
+def free_units_for_tool(tool: Tool, start_date: date, end_date: date) -> int:
+    return free_units(start_date, end_date, [tool])[tool.id]
+
+
+def daily_free_units(tool: Tool, start_date: date, end_date: date) -> list:
+    """[(day, free_units), ...] for a single tool - used for calendars."""
+    # Day offsets from start_date, so nothing steps past end_date (or date.max)
+    span = (end_date - start_date).days
+    booked = defaultdict(int)
+    for _, r_start, r_end, qty in overlapping_rentals(start_date, end_date, [tool.id]):
+        first = max((r_start - start_date).days, 0)
+        last = min((r_end - start_date).days, span)
+        for offset in range(first, last + 1):
+            booked[offset] += qty
+
+    return [
+        (start_date + timedelta(days=offset), max((tool.available_qty or 0) - booked[offset], 0))
+        for offset in range(span + 1)
+    ]
+
+
+def parse_window(args, default_days: int = 1):
+    """
+    ?start=YYYY-MM-DD&end=YYYY-MM-DD from a request, defaulting to
+    today .. today + default_days - 1. Invalid input falls back to defaults;
+    windows longer than MAX_WINDOW_DAYS are cut to that length.
+    """
+    today = date.today()
+    start_date = _parse_date(args.get("start")) or today
+    end_date = _parse_date(args.get("end"))
+    span = (end_date - start_date).days if end_date else default_days - 1
+    span = max(0, min(span, MAX_WINDOW_DAYS - 1, (date.max - start_date).days))
+    return start_date, start_date + timedelta(days=span)
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat((value or "").strip())
+    except ValueError:
+        return None
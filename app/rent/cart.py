@@ -0,0 +1,178 @@
+from collections import defaultdict, namedtuple
+from datetime import date, timedelta
+
+from flask import session
+
+from ..extensions import db
+from ..ledger import balances as ledger  # module import: ledger imports payments, which imports us
+from ..payments.models import Order, Payment
+from ..utils.locking import lock_for_write
+from .availability import overlapping_rentals
+from .models import Tool, RentalRequest
+from .pricing import PricingError, quote
+
+SESSION_KEY = "rent_cart"
+MAX_LINES = 50
+
+CartLine = namedtuple("CartLine", "tool_id start_date end_date quantity")
+
+
+class CartError(ValueError):
+    pass
+
+
+# --- Session storage ---------------------------------------------------------
+
+def get_cart() -> list:
+    lines = []
+    for raw in session.get(SESSION_KEY, []):
+        try:
+            lines.append(CartLine(
+                int(raw["tool_id"]),
+                date.fromisoformat(raw["start"]),
+                date.fromisoformat(raw["end"]),
+                int(raw["quantity"]),
+            ))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return lines
+
+
+def save_cart(lines):
+    session[SESSION_KEY] = [
+        {"tool_id": l.tool_id, "start": l.start_date.isoformat(), "end": l.end_date.isoformat(), "quantity": l.quantity}
+        for l in lines
+    ]
+
+
+def add_to_cart(line: CartLine):
+    lines = get_cart()
+    # Same tool + same dates -> bump quantity instead of a second line
+    for i, existing in enumerate(lines):
+        if existing[:3] == line[:3]:
+            lines[i] = existing._replace(quantity=existing.quantity + line.quantity)
+            break
+    else:
+        if len(lines) >= MAX_LINES:
+            raise CartError(f"A cart can hold at most {MAX_LINES} lines.")
+        lines.append(line)
+    save_cart(lines)
+
+
+def remove_from_cart(index: int):
+    lines = get_cart()
+    if 0 <= index < len(lines):
+        del lines[index]
+    save_cart(lines)
+
+
+def clear_cart():
+    session.pop(SESSION_KEY, None)
+
+
+# --- Validation + checkout ---------------------------------------------------
+
+def check_availability(lines, tools: dict) -> dict:
+    """
+    Validate all lines together against existing rentals with one query.
+    Lines for the same tool are stacked, so two overlapping lines can't each
+    take the last unit. Returns {tool_id: short_by} for tools that don't fit.
+    """
+    if not lines:
+        return {}
+
+    window_start = min(l.start_date for l in lines)
+    window_end = max(l.end_date for l in lines)
+
+    deltas = defaultdict(lambda: defaultdict(int))
+    requested_days = defaultdict(set)
+    for l in lines:
+        deltas[l.tool_id][l.start_date] += l.quantity
+        deltas[l.tool_id][l.end_date + timedelta(days=1)] -= l.quantity
+        requested_days[l.tool_id].add((l.start_date, l.end_date))
+
+    for tool_id, r_start, r_end, qty in overlapping_rentals(window_start, window_end, list(deltas)):
+        deltas[tool_id][max(r_start, window_start)] += qty
+        deltas[tool_id][min(r_end, window_end) + timedelta(days=1)] -= qty
+
+    shortages = {}
+    for tool_id, per_day in deltas.items():
+        capacity = tools[tool_id].available_qty or 0
+        running = 0
+        worst = 0
+        for day in sorted(per_day):
+            running += per_day[day]
+            in_cart = any(s <= day <= e for s, e in requested_days[tool_id])
+            if in_cart and running > capacity:
+                worst = max(worst, running - capacity)
+        if worst:
+            shortages[tool_id] = worst
+    return shortages
+
+
+def price_lines(lines):
+    """[(CartLine, Tool, Quote)] with one Tool query for the whole cart."""
+    tool_ids = {l.tool_id for l in lines}
+    tools = {t.id: t for t in db.session.scalars(db.select(Tool).where(Tool.id.in_(tool_ids)))} if tool_ids else {}
+
+    priced = []
+    for l in lines:
+        tool = tools.get(l.tool_id)
+        if tool is None:
+            raise CartError("A tool in your cart no longer exists.")
+        try:
+            priced.append((l, tool, quote(tool, l.start_date, l.end_date, l.quantity)))
+        except PricingError as e:
+            raise CartError(f"{tool.name}: {e}")
+    return priced
+
+
+def checkout(user_id: int, lines) -> Order:
+    """
+    One Order + one Payment + N RentalRequest rows in a single transaction.
+    Everything is validated before anything is written, under a write lock
+    so two checkouts can't both take the last unit.
+    """
+    if not lines:
+        raise CartError("Your cart is empty.")
+
+    priced = price_lines(lines)
+    tools = {tool.id: tool for _, tool, _ in priced}
+
+    lock_for_write(db.select(Tool.id).where(Tool.id.in_(tools)).order_by(Tool.id))
+    shortages = check_availability(lines, tools)
+    if shortages:
+        names = ", ".join(f"{tools[tid].name} (short by {n})" for tid, n in shortages.items())
+        db.session.rollback()  # release the lock
+        raise CartError(f"Not enough units free for: {names}.")
+
+    total = sum(q.total for _, _, q in priced)
+
+    account = ledger.get_account(user_id)
+    if account.available is not None and total > account.available:
+        db.session.rollback()
+        raise CartError(
+            f"This order ({total:,} MNT) exceeds your available credit ({max(account.available, 0):,} MNT). "
+            "Please settle open invoices first."
+        )
+
+    order = Order(user_id=user_id, total_amount=total, status="pending")
+    db.session.add(order)
+    db.session.flush()  # order.id for the children; the only extra round-trip
+
+    db.session.add(Payment(order_id=order.id, amount=total, status="unpaid"))
+    db.session.add_all([
+        RentalRequest(
+            user_id=user_id,
+            tool_id=line.tool_id,
+            start_date=line.start_date,
+            end_date=line.end_date,
+            quantity=line.quantity,
+            days=q.days,
+            total_cost=q.total,
+            order_id=order.id,
+        )
+        for line, _, q in priced
+    ])
+    db.session.commit()
+    return order
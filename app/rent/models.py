@@ -3,6 +3,9 @@ from ..extensions import db
 
 
 class Tool(db.Model):
+    # Keyset pagination in the catalog API walks (name, id)
+    __table_args__ = (db.Index("ix_tool_name_id", "name", "id"),)
+
     id = db.Column(db.Integer, primary_key=True)
 
     # NEW: used to show image from static/products/<part_number>.png
@@ -21,6 +24,13 @@ class Tool(db.Model):
 
 
 class RentalRequest(db.Model):
+    # Availability looks up rentals overlapping a date window
+    # (end_date >= D1 AND start_date <= D2), per tool or catalog-wide.
+    __table_args__ = (
+        db.Index("ix_rental_request_tool_end_start", "tool_id", "end_date", "start_date"),
+        db.Index("ix_rental_request_end_start", "end_date", "start_date"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
 
@@ -32,6 +42,6 @@ class RentalRequest(db.Model):
     days = db.Column(db.Integer, nullable=False)
     total_cost = db.Column(db.Integer, nullable=False)  # MNT int
 
-    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=True, index=True)
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
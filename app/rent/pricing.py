@@ -0,0 +1,129 @@
+from collections import namedtuple
+from datetime import date
+
+from ..extensions import db
+from .models import Tool
+
+# (first day, last day or None, Tool column) - the Excel catalog's tiers.
+# Rentals longer than 30 days stay on the 8-30 rate.
+TIERS = (
+    (1, 7, "daily_price"),
+    (8, None, "daily_price_8_30"),
+)
+
+MAX_QUOTE_LINES = 500
+
+Quote = namedtuple("Quote", "tool_id start_date end_date quantity days tier daily_rate total")
+
+
+class PricingError(ValueError):
+    pass
+
+
+def calc_days(start_date: date, end_date: date) -> int:
+    """Both ends inclusive: Mon..Mon is one day, Mon..Tue is two."""
+    delta = (end_date - start_date).days + 1
+    return max(delta, 1)
+
+
+def _label(first: int, last) -> str:
+    return f"{first}-{last}" if last else f"{first}+"
+
+
+def tier_for(days: int):
+    for first, last, column in TIERS:
+        if days >= first and (last is None or days <= last):
+            return first, last, column
+    return TIERS[0]
+
+
+def daily_rate(tool: Tool, days: int):
+    """(tier label, MNT per unit per day). Missing tier prices fall back to daily_price."""
+    first, last, column = tier_for(days)
+    rate = getattr(tool, column)
+    if rate is None:
+        first, last, column = TIERS[0]
+        rate = tool.daily_price
+    return _label(first, last), rate
+
+
+def quote(tool: Tool, start_date: date, end_date: date, quantity: int = 1, today: date = None) -> Quote:
+    if end_date < start_date:
+        raise PricingError("End date must be after start date.")
+    if start_date < (today or date.today()):
+        raise PricingError("Start date is in the past.")
+    if quantity < 1:
+        raise PricingError("Invalid quantity.")
+
+    days = calc_days(start_date, end_date)
+    tier, rate = daily_rate(tool, days)
+    return Quote(
+        tool_id=tool.id,
+        start_date=start_date,
+        end_date=end_date,
+        quantity=quantity,
+        days=days,
+        tier=tier,
+        daily_rate=rate,
+        total=days * rate * quantity,
+    )
+
+
+def quote_catalog(tools, start_date: date, end_date: date, quantity: int = 1) -> dict:
+    """
+    tool_id -> Quote for one window across many tools. Tier selection depends
+    only on the window, so it is resolved once and applied to every tool.
+    """
+    if end_date < start_date:
+        raise PricingError("End date must be after start date.")
+
+    days = calc_days(start_date, end_date)
+    first, last, column = tier_for(days)
+    label = _label(first, last)
+    base_label = _label(TIERS[0][0], TIERS[0][1])
+
+    quotes = {}
+    for tool in tools:
+        rate = getattr(tool, column)
+        tier = label
+        if rate is None:
+            rate, tier = tool.daily_price, base_label
+        quotes[tool.id] = Quote(tool.id, start_date, end_date, quantity, days, tier, rate, days * rate * quantity)
+    return quotes
+
+
+def batch_quote(lines, today: date = None) -> list:
+    """
+    Price many (tool_id, start_date, end_date, quantity) lines with a single
+    Tool query. Returns [(Quote or None, error or None), ...] in input order.
+    """
+    if len(lines) > MAX_QUOTE_LINES:
+        raise PricingError(f"At most {MAX_QUOTE_LINES} lines per request.")
+
+    tool_ids = {line[0] for line in lines}
+    tools = {t.id: t for t in db.session.scalars(db.select(Tool).where(Tool.id.in_(tool_ids)))} if tool_ids else {}
+
+    results = []
+    for tool_id, start_date, end_date, quantity in lines:
+        tool = tools.get(tool_id)
+        if tool is None:
+            results.append((None, "Unknown tool."))
+            continue
+        try:
+            results.append((quote(tool, start_date, end_date, quantity, today=today), None))
+        except PricingError as e:
+            results.append((None, str(e)))
+    return results
+
+
+def quote_to_dict(q: Quote) -> dict:
+    return {
+        "tool_id": q.tool_id,
+        "start": q.start_date.isoformat(),
+        "end": q.end_date.isoformat(),
+        "quantity": q.quantity,
+        "days": q.days,
+        "tier": q.tier,
+        "daily_rate": q.daily_rate,
+        "total": q.total,
+    }
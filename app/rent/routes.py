@@ -1,74 +1,149 @@
 ﻿from datetime import datetime
-from flask import render_template, redirect, url_for, flash, request
+from flask import render_template, redirect, url_for, flash, request, jsonify
 from flask_login import login_required, current_user
 
-from ..extensions import db
-from ..payments.models import Order, Payment
-from .models import Tool, RentalRequest
+from .models import Tool
+from .availability import free_units, daily_free_units, parse_window
+from .cart import CartError, CartLine, add_to_cart, remove_from_cart, checkout
+from ..catalog.versioning import catalog_cached
+from ..utils.query_budget import query_budget
+from .cart import SESSION_KEY as CART_SESSION_KEY
+from .pricing import PricingError, quote_catalog, batch_quote, quote_to_dict
 from . import bp
 
-def calc_days(start_date, end_date):
-    delta = (end_date - start_date).days + 1
-    return max(delta, 1)
-
 @bp.route('/tools', methods=['GET', 'POST'])
 @login_required
+@query_budget(3, methods=("GET", "HEAD"))
+@query_budget(13, methods=("POST",))
+@catalog_cached("tools", "rentals", session_keys=(CART_SESSION_KEY,), daily=True)
 def tools():
-    tools = Tool.query.order_by(Tool.name.asc()).all()
-
     if request.method == 'POST':
         tool_id = int(request.form.get('tool_id'))
         start_str = request.form.get('start_date')
         end_str = request.form.get('end_date')
         qty = int(request.form.get('quantity') or 1)
 
-        tool = Tool.query.get_or_404(tool_id)
+        Tool.query.get_or_404(tool_id)
 
         start_date = datetime.strptime(start_str, '%Y-%m-%d').date()
         end_date = datetime.strptime(end_str, '%Y-%m-%d').date()
 
-        if end_date < start_date:
-            flash("End date must be after start date.", "danger")
-            return redirect(url_for('rent.tools'))
-
-        if qty < 1 or qty > tool.available_qty:
-            flash("Invalid quantity.", "danger")
-            return redirect(url_for('rent.tools'))
-
-        days = calc_days(start_date, end_date)
-        total_cost = days * tool.daily_price * qty
-
-        rental = RentalRequest(
-            user_id=current_user.id,
-            tool_id=tool.id,
-            start_date=start_date,
-            end_date=end_date,
-            quantity=qty,
-            days=days,
-            total_cost=total_cost,
-        )
-        db.session.add(rental)
-        db.session.flush()
+        # "Rent now" is a one-line cart checkout
+        try:
+            order = checkout(current_user.id, [CartLine(tool_id, start_date, end_date, qty)])
+        except CartError as e:
+            flash(str(e), "danger")
+            return redirect(url_for('rent.tools', start=start_str, end=end_str))
 
-        order = Order(
-            user_id=current_user.id,
-            total_amount=total_cost,
-            status='pending'
-        )
-        db.session.add(order)
-        db.session.flush()
+        flash("Rental request created. Please choose payment method.", "success")
+        return redirect(url_for('payments.checkout', order_id=order.id))
+
+    tools = Tool.query.order_by(Tool.name.asc()).all()
+    start_date, end_date = parse_window(request.args)
+    availability = free_units(start_date, end_date, tools)
+    return render_template(
+        'milwaukee/tool_rent.html',
+        tools=tools,
+        availability=availability,
+        quotes=quote_catalog(tools, start_date, end_date),
+        start_date=start_date,
+        end_date=end_date,
+    )
 
-        payment = Payment(
-            order_id=order.id,
-            amount=total_cost,
-            status='unpaid'
+@bp.route('/cart/add', methods=['POST'])
+@login_required
+def cart_add():
+    try:
+        line = CartLine(
+            int(request.form.get('tool_id')),
+            datetime.strptime(request.form.get('start_date'), '%Y-%m-%d').date(),
+            datetime.strptime(request.form.get('end_date'), '%Y-%m-%d').date(),
+            int(request.form.get('quantity') or 1),
         )
-        db.session.add(payment)
+    except (TypeError, ValueError):
+        flash("Choose a tool, dates and quantity.", "danger")
+        return redirect(request.referrer or url_for('milwaukee.tool_rent'))
 
-        rental.order_id = order.id
-        db.session.commit()
+    if line.end_date < line.start_date or line.quantity < 1:
+        flash("Invalid dates or quantity.", "danger")
+        return redirect(request.referrer or url_for('milwaukee.tool_rent'))
 
-        flash("Rental request created. Please choose payment method.", "success")
-        return redirect(url_for('payments.checkout', order_id=order.id))
+    try:
+        add_to_cart(line)
+    except CartError as e:
+        flash(str(e), "danger")
+    else:
+        flash("Added to cart.", "success")
+    return redirect(request.referrer or url_for('milwaukee.tool_rent'))
+
+@bp.route('/cart/remove/<int:index>', methods=['POST'])
+@login_required
+def cart_remove(index):
+    remove_from_cart(index)
+    return redirect(url_for('milwaukee.tool_rent_checkout'))
+
+@bp.route('/availability')
+def availability():
+    start_date, end_date = parse_window(request.args)
+    tool_ids = request.args.getlist('tool_id', type=int)
+
+    if tool_ids:
+        tools = Tool.query.filter(Tool.id.in_(tool_ids)).all()
+    else:
+        tools = Tool.query.all()
+
+    payload = {
+        'start': start_date.isoformat(),
+        'end': end_date.isoformat(),
+        'free': {str(tool_id): n for tool_id, n in free_units(start_date, end_date, tools).items()},
+    }
+
+    # Per-day breakdown for a single tool (calendar widgets)
+    if len(tools) == 1 and request.args.get('daily'):
+        payload['days'] = [
+            {'date': day.isoformat(), 'free': n}
+            for day, n in daily_free_units(tools[0], start_date, end_date)
+        ]
+    return jsonify(payload)
+
+@bp.route('/quote', methods=['GET', 'POST'])
+def quote_batch():
+    """
+    GET  ?start=&end=&quantity=  -> price every tool for one window
+    POST {"lines": [{"tool_id": 1, "start": "...", "end": "...", "quantity": 2}, ...]}
+    """
+    if request.method == 'GET':
+        start_date, end_date = parse_window(request.args)
+        quantity = max(request.args.get('quantity', 1, type=int), 1)
+        quotes = quote_catalog(Tool.query.all(), start_date, end_date, quantity)
+        return jsonify({'quotes': [quote_to_dict(q) for q in quotes.values()]})
+
+    data = request.get_json(silent=True)
+    raw_lines = data.get('lines') if isinstance(data, dict) else None
+    if not isinstance(raw_lines, list) or not all(isinstance(line, dict) for line in raw_lines):
+        return jsonify({'error': 'Send a JSON object with a "lines" list of line objects.'}), 400
+
+    lines = []
+    for line in raw_lines:
+        try:
+            lines.append((
+                int(line['tool_id']),
+                datetime.strptime(line['start'], '%Y-%m-%d').date(),
+                datetime.strptime(line['end'], '%Y-%m-%d').date(),
+                int(line.get('quantity') or 1),
+            ))
+        except (KeyError, TypeError, ValueError):
+            return jsonify({'error': 'Each line needs tool_id, start, end (YYYY-MM-DD) and quantity.'}), 400
+
+    try:
+        results = batch_quote(lines)
+    except PricingError as e:
+        return jsonify({'error': str(e)}), 400
 
-    return render_template('milwaukee/tool_rent.html', tools=tools)
+    return jsonify({
+        'quotes': [
+            quote_to_dict(q) if q else {'tool_id': line[0], 'error': error}
+            for line, (q, error) in zip(lines, results)
+        ],
+        'total': sum(q.total for q, _ in results if q),
+    })
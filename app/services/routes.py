@@ -1,18 +1,23 @@
 ﻿from flask import render_template
+from ..utils.page_cache import cached_page
 from . import bp
 
 @bp.route('/procurement')
+@cached_page
 def procurement():
     return render_template('services/procurement.html')
 
 @bp.route('/training')
+@cached_page
 def training():
     return render_template('services/training.html')
 
 @bp.route('/training/catalog')
+@cached_page
 def course_catalog():
     return render_template('services/course_catalog.html')
 
 @bp.route('/training/registration')
+@cached_page
 def training_registration():
     return render_template('services/training_registration.html')
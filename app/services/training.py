@@ -0,0 +1,122 @@
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import func, update
+
+from ..extensions import db
+from ..forms_models import TrainingRegistration, TrainingSession
+from ..outbox.sender import enqueue_many
+from ..utils.email_utils import build_ics_events
+
+InviteResult = namedtuple("InviteResult", "queued already_invited over_capacity")
+
+
+class TrainingError(ValueError):
+    pass
+
+
+def get_session(session_id: int) -> TrainingSession:
+    session = db.session.get(TrainingSession, session_id)
+    if session is None:
+        raise TrainingError(f"Training session {session_id} not found.")
+    return session
+
+
+def seats_taken(session_id: int) -> int:
+    return db.session.scalar(
+        db.select(func.count(TrainingRegistration.id)).where(TrainingRegistration.session_id == session_id)
+    ) or 0
+
+
+def assign_registrations(session: TrainingSession) -> int:
+    """
+    Fill the free seats of `session` with unscheduled registrations for the
+    same course, oldest first. One SELECT for the ids + one UPDATE.
+    """
+    free = session.capacity - seats_taken(session.id)
+    if free <= 0:
+        return 0
+
+    ids = db.session.scalars(
+        db.select(TrainingRegistration.id)
+        .where(TrainingRegistration.course == session.course, TrainingRegistration.session_id.is_(None))
+        .order_by(TrainingRegistration.created_at, TrainingRegistration.id)
+        .limit(free)
+    ).all()
+    if ids:
+        db.session.execute(
+            update(TrainingRegistration).where(TrainingRegistration.id.in_(ids)).values(session_id=session.id),
+            execution_options={"synchronize_session": False},
+        )
+        db.session.commit()
+    return len(ids)
+
+
+def invitation_uid(session_id: int, registration_id: int) -> str:
+    # Stable per attendee: a re-sent invite updates the same calendar entry
+    return f"training-{session_id}-{registration_id}@greystone"
+
+
+def invite_session(session_id: int, resend: bool = False) -> InviteResult:
+    """
+    Invite every registrant of a session: one query for the attendees, ICS
+    payloads built in one pass, one bulk INSERT into the email outbox and one
+    UPDATE of invited_at, all in a single commit. Delivery is left to the
+    outbox sender (batched and throttled), so this returns immediately.
+    Registrants beyond `capacity` (in sign-up order) are not invited.
+    """
+    session = get_session(session_id)
+
+    rows = db.session.execute(
+        db.select(
+            TrainingRegistration.id,
+            TrainingRegistration.name,
+            TrainingRegistration.email,
+            TrainingRegistration.invited_at,
+        )
+        .where(TrainingRegistration.session_id == session.id)
+        .order_by(TrainingRegistration.created_at, TrainingRegistration.id)
+    ).all()
+
+    seated = rows[:session.capacity]
+    over_capacity = len(rows) - len(seated)
+    pending = [r for r in seated if resend or r.invited_at is None]
+    already_invited = len(seated) - len(pending)
+    if not pending:
+        return InviteResult(0, already_invited, over_capacity)
+
+    when = session.starts_at.strftime("%Y-%m-%d %H:%M")
+    subject = f"Grey Stone training invitation: {session.course} ({when})"
+    description = f"{session.course} training at {session.location}."
+
+    names = {r.id: r.name for r in pending}
+    attendees = [(invitation_uid(session.id, r.id), r.name, r.email) for r in pending]
+    events = build_ics_events(
+        session.course, description, session.starts_at, attendees,
+        duration_minutes=session.duration_minutes, location=session.location,
+    )
+
+    messages = (
+        {
+            "to_email": email,
+            "subject": subject,
+            "body": (
+                f"Hello {names[reg_id]},\n\nYou are registered for {session.course} on {when} "
+                f"at {session.location}.\nThe calendar invitation is attached.\n\n- Grey Stone"
+            ),
+            "attachment_name": "invite.ics",
+            "attachment_type": "text/calendar",
+            "attachment_data": ics,
+        }
+        for reg_id, (email, ics) in zip((r.id for r in pending), events)
+    )
+    queued = enqueue_many(messages, commit=False)
+
+    db.session.execute(
+        update(TrainingRegistration)
+        .where(TrainingRegistration.id.in_([r.id for r in pending]))
+        .values(invited_at=datetime.utcnow()),
+        execution_options={"synchronize_session": False},
+    )
+    db.session.commit()
+    return InviteResult(queued, already_invited, over_capacity)
@@ -1,4 +1,5 @@
 ﻿from flask import render_template
+from ..utils.page_cache import cached_page
 from . import bp
 
 @bp.route('/leave-message')
@@ -6,5 +7,6 @@ def leave_message():
     return render_template('support/leave_message.html')
 
 @bp.route('/faq')
+@cached_page
 def faq():
     return render_template('support/faq.html')
@@ -1,8 +1,12 @@
 ﻿import os
+import uuid
 from datetime import datetime, timedelta
+from email.utils import parseaddr
 
-from flask import current_app
-from flask_mail import Mail, Message
+from flask import current_app, has_app_context
+from flask_mail import Mail
+
+from ..outbox.sender import DEFAULT_BATCH_PAUSE, enqueue_email
 
 mail = Mail()
 
@@ -13,50 +17,101 @@ def init_mail(app):
     app.config["MAIL_USERNAME"] = os.getenv("MAIL_USERNAME", "")
     app.config["MAIL_PASSWORD"] = os.getenv("MAIL_PASSWORD", "")
     app.config["MAIL_DEFAULT_SENDER"] = os.getenv("MAIL_DEFAULT_SENDER", app.config.get("MAIL_USERNAME", ""))
+    # Local/test runs: the outbox sender goes through the motions, SMTP is never touched
+    app.config["MAIL_SUPPRESS_SEND"] = os.getenv("MAIL_SUPPRESS_SEND", "false").lower() == "true"
+    # Seconds between full outbox batches (fan-outs stay under the relay's rate limit)
+    app.config["OUTBOX_BATCH_PAUSE"] = float(os.getenv("OUTBOX_BATCH_PAUSE", DEFAULT_BATCH_PAUSE))
 
     mail.init_app(app)
 
-def send_basic_email(to_email: str, subject: str, body: str):
-    if not current_app.config.get("MAIL_SERVER") or not current_app.config.get("MAIL_USERNAME"):
-        current_app.logger.warning("Email not sent (MAIL not configured).")
-        return False
+    if os.getenv("OUTBOX_BACKGROUND_SENDER", "false").lower() == "true":
+        from ..outbox.sender import start_background_sender
+        start_background_sender(
+            app,
+            batch_size=int(os.getenv("OUTBOX_BATCH_SIZE", "50")),
+            poll_interval=float(os.getenv("OUTBOX_POLL_INTERVAL", "5")),
+            batch_pause=app.config["OUTBOX_BATCH_PAUSE"],
+        )
+
+def send_basic_email(to_email: str, subject: str, body: str, commit: bool = True):
+    """
+    Queue the message in the email outbox; `python send_outbox.py` (or the
+    background sender) delivers it. Pass commit=False to ride along with the
+    caller's own transaction.
+    """
+    return enqueue_email(to_email, subject, body, commit=commit)
+
+def _ics_time(dt: datetime) -> str:
+    return dt.strftime("%Y%m%dT%H%M%S")
+
+def _ics_text(value: str) -> str:
+    # RFC 5545 TEXT escaping; an unescaped comma/newline breaks some clients
+    return (value or "").replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
 
-    msg = Message(subject=subject, recipients=[to_email], body=body)
-    mail.send(msg)
-    return True
+def _ics_fold(line: str) -> str:
+    """RFC 5545 3.1: lines over 75 octets continue on CRLF + space, never inside a UTF-8 character."""
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line + "\r\n"
+    parts = []
+    limit = 75
+    while data:
+        cut = min(limit, len(data))
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(data[:cut].decode("utf-8"))
+        data = data[cut:]
+        limit = 74  # the leading space counts
+    return "\r\n ".join(parts) + "\r\n"
 
-def build_ics_event(title: str, description: str, start_dt: datetime, duration_minutes: int = 60, location: str = "Grey Stone (TBD)") -> str:
+def _ics_lines(*lines) -> str:
+    return "".join(_ics_fold(line) for line in lines if line)
+
+def _default_organizer():
+    if not has_app_context():
+        return None
+    sender = current_app.config.get("MAIL_DEFAULT_SENDER")
+    name, email = sender if isinstance(sender, tuple) else parseaddr(sender or "")
+    return (name or "Grey Stone", email) if email else None
+
+def build_ics_events(title: str, description: str, start_dt: datetime, attendees, duration_minutes: int = 60, location: str = "Grey Stone (TBD)", organizer=None):
+    """
+    One ICS string per attendee for the same event, in one pass: the shared
+    part is formatted once, only UID / ATTENDEE differ.
+    `attendees` is an iterable of (uid, name, email); yields (email, ics).
+    `organizer` is (name, email), by default MAIL_DEFAULT_SENDER.
+    """
     end_dt = start_dt + timedelta(minutes=duration_minutes)
+    organizer = organizer or _default_organizer()
 
-    def fmt(dt: datetime) -> str:
-        return dt.strftime("%Y%m%dT%H%M%S")
-
-    uid = f"{fmt(start_dt)}-greystone@local"
-
-    ics = f"""BEGIN:VCALENDAR
-VERSION:2.0
-PRODID:-//Grey Stone//Training//EN
-CALSCALE:GREGORIAN
-METHOD:REQUEST
-BEGIN:VEVENT
-UID:{uid}
-DTSTAMP:{fmt(datetime.utcnow())}
-DTSTART:{fmt(start_dt)}
-DTEND:{fmt(end_dt)}
-SUMMARY:{title}
-DESCRIPTION:{description}
-LOCATION:{location}
-END:VEVENT
-END:VCALENDAR
-"""
-    return ics
+    head = _ics_lines(
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Grey Stone//Training//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:REQUEST",
+        "BEGIN:VEVENT",
+    )
+    tail = _ics_lines(
+        f"ORGANIZER;CN={_ics_text(organizer[0])}:mailto:{organizer[1]}" if organizer else None,
+        f"DTSTAMP:{_ics_time(datetime.utcnow())}",
+        f"DTSTART:{_ics_time(start_dt)}",
+        f"DTEND:{_ics_time(end_dt)}",
+        f"SUMMARY:{_ics_text(title)}",
+        f"DESCRIPTION:{_ics_text(description)}",
+        f"LOCATION:{_ics_text(location)}",
+        "END:VEVENT",
+        "END:VCALENDAR",
+    )
+    for uid, name, email in attendees:
+        attendee = f"ATTENDEE;CN={_ics_text(name)};RSVP=TRUE:mailto:{email}" if email else None
+        yield email, head + _ics_lines(f"UID:{uid}", attendee) + tail
 
-def send_email_with_ics(to_email: str, subject: str, body: str, ics_content: str, filename: str = "invite.ics"):
-    if not current_app.config.get("MAIL_SERVER") or not current_app.config.get("MAIL_USERNAME"):
-        current_app.logger.warning("Email with ICS not sent (MAIL not configured).")
-        return False
+def build_ics_event(title: str, description: str, start_dt: datetime, duration_minutes: int = 60, location: str = "Grey Stone (TBD)", uid: str = None) -> str:
+    # A UID made from the start time alone collides between events/attendees
+    uid = uid or f"{uuid.uuid4().hex}@greystone"
+    _, ics = next(build_ics_events(title, description, start_dt, [(uid, None, None)], duration_minutes, location))
+    return ics
 
-    msg = Message(subject=subject, recipients=[to_email], body=body)
-    msg.attach(filename, "text/calendar", ics_content)
-    mail.send(msg)
-    return True
+def send_email_with_ics(to_email: str, subject: str, body: str, ics_content: str, filename: str = "invite.ics", commit: bool = True):
+    return enqueue_email(to_email, subject, body, attachment=(filename, "text/calendar", ics_content), commit=commit)
@@ -1,5 +1,6 @@
 ﻿from flask_wtf import FlaskForm
-from wtforms import StringField, TextAreaField, IntegerField, SelectField, SubmitField
+from flask_wtf.file import FileField, FileRequired, FileAllowed
+from wtforms import StringField, TextAreaField, IntegerField, SelectField, SubmitField, BooleanField
 from wtforms.validators import DataRequired, Email, Length, Optional, NumberRange
 
 
@@ -37,3 +38,13 @@ class TrainingRegistrationForm(FlaskForm):
     phone = StringField("Phone (optional)", validators=[Optional(), Length(max=50)])
     notes = TextAreaField("Notes (optional)", validators=[Optional(), Length(max=3000)])
     submit = SubmitField("Register")
+
+
+class BankStatementForm(FlaskForm):
+    statement = FileField(
+        "Bank statement (CSV or MT940)",
+        validators=[FileRequired(), FileAllowed(["csv", "txt", "sta", "mt940"], "CSV or MT940 files only.")],
+    )
+    dry_run = BooleanField("Dry run (match only, change nothing)")
+    download_report = BooleanField("Download the report of unmatched lines as CSV")
+    submit = SubmitField("Reconcile")
@@ -0,0 +1,145 @@
+import csv
+import json
+import os
+import re
+import unicodedata
+from collections import namedtuple
+from urllib.parse import quote
+
+from flask import current_app, request
+
+# Originals + the supplier's part-number -> file mapping (relative to static/)
+SOURCE_DIR = "products"
+MAPPING_NAME = "image_mapping.csv"
+PLACEHOLDER = "img/logo.png"
+
+# Output of build_images.py (relative to the static folder)
+BUILD_DIR = "build/products"
+MANIFEST_NAME = "manifest.json"
+
+# Fingerprinted files never change under the same name -> cache "forever"
+IMMUTABLE_MAX_AGE = 31536000
+
+ProductImage = namedtuple("ProductImage", "src srcset webp_srcset width height placeholder")
+
+# part number -> image file, plus the leftovers the audit reports on
+ImageIndex = namedtuple("ImageIndex", "by_part files broken_mappings")
+
+
+def normalize_part_number(value) -> str:
+    """
+    Canonical key for matching part numbers to file names:
+      "M12 FIW2F12-0X0 "  -> "M12 FIW2F12-0X0"
+      "49-66-7834\\u200b"  -> "49-66-7834"   (zero-width / format chars)
+      "M18 FCHS背包"       -> "M18 FCHS"     (trailing non-ASCII label)
+      "m18  fb6"          -> "M18 FB6"
+    """
+    s = unicodedata.normalize("NFKC", str(value or ""))
+    s = "".join(ch for ch in s if unicodedata.category(ch) != "Cf")
+    s = re.sub(r"[^\x00-\x7f]+$", "", s.strip())
+    return re.sub(r"\s+", " ", s).strip().upper()
+
+
+def build_image_index(static_folder: str) -> ImageIndex:
+    """
+    Map normalized part numbers to files in static/products.
+    Every PNG is indexed by its own (normalized) name; image_mapping.csv
+    then adds/overrides aliases where the model differs from the file name.
+    """
+    src_dir = os.path.join(static_folder, SOURCE_DIR)
+    files = sorted(n for n in os.listdir(src_dir) if n.lower().endswith(".png")) if os.path.isdir(src_dir) else []
+
+    by_part = {}
+    by_norm_file = {}
+    for name in files:
+        key = normalize_part_number(os.path.splitext(name)[0])
+        by_part.setdefault(key, name)
+        by_norm_file.setdefault(normalize_part_number(name), name)
+
+    broken = []
+    mapping_path = os.path.join(src_dir, MAPPING_NAME)
+    if os.path.exists(mapping_path):
+        with open(mapping_path, "r", encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                key = normalize_part_number(row.get("Model"))
+                filename = (row.get("ImageFilename") or "").strip()
+                if not key or not filename:
+                    continue
+                actual = filename if filename in files else by_norm_file.get(normalize_part_number(filename))
+                if actual:
+                    by_part[key] = actual
+                else:
+                    broken.append((row.get("Model"), filename))
+
+    return ImageIndex(by_part=by_part, files=files, broken_mappings=broken)
+
+
+def load_image_manifest(app) -> dict:
+    path = os.path.join(app.static_folder, BUILD_DIR, MANIFEST_NAME)
+    if not os.path.exists(path):
+        app.logger.info("Image manifest not found (%s); serving original product images.", path)
+        return {}
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("images", {})
+
+
+def _resolve_images(app, index: ImageIndex, manifest: dict) -> dict:
+    """Pre-render every ProductImage once so lookups at request time are a dict hit."""
+    base = app.static_url_path.rstrip("/")
+
+    def url(path: str) -> str:
+        return f"{base}/{quote(path)}"
+
+    def srcset(paths: dict) -> str:
+        return ", ".join(f"{url(p)} {w}w" for w, p in sorted(paths.items(), key=lambda kv: int(kv[0])))
+
+    resolved = {}
+    for key, filename in index.by_part.items():
+        entry = manifest.get(os.path.splitext(filename)[0])
+        if not entry:
+            resolved[key] = ProductImage(url(f"{SOURCE_DIR}/{filename}"), None, None, None, None, False)
+            continue
+
+        png = entry["png"]
+        resolved[key] = ProductImage(
+            src=url(png[min(png, key=int)]),
+            srcset=srcset(png),
+            webp_srcset=srcset(entry["webp"]) if entry.get("webp") else None,
+            width=entry.get("thumb_width"),
+            height=entry.get("thumb_height"),
+            placeholder=False,
+        )
+
+    resolved[None] = ProductImage(url(PLACEHOLDER), None, None, None, None, True)
+    return resolved
+
+
+def product_image(part_number) -> ProductImage:
+    """Thumbnail set for a part number, or the placeholder when there is no image."""
+    images = current_app.extensions["product_images"]
+    return images.get(normalize_part_number(part_number)) or images[None]
+
+
+def init_images(app):
+    index = build_image_index(app.static_folder)
+    app.extensions["product_images"] = _resolve_images(app, index, load_image_manifest(app))
+    app.jinja_env.globals["product_image"] = product_image
+
+    build_prefix = BUILD_DIR.split("/")[0] + "/"
+
+    @app.after_request
+    def _cache_fingerprinted_static(response):
+        filename = (request.view_args or {}).get("filename", "")
+        if (
+            request.endpoint == "static"
+            and filename.startswith(build_prefix)
+            and not filename.endswith(MANIFEST_NAME)
+            and response.status_code in (200, 304)
+        ):
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        return response
@@ -0,0 +1,32 @@
+from ..extensions import db
+
+
+def lock_for_write(rows=None):
+    """
+    Serialise the current transaction with other writers before a
+    read-check-write (stock check then insert, "still unpaid?" then update).
+    Call it before the check, before the transaction has written anything.
+
+    SQLite: BEGIN IMMEDIATE takes the database write lock now (waiting up to
+    busy_timeout), so no other writer can commit between the check and our
+    writes. Other databases: `rows` (a select of the rows the check depends
+    on) is run with FOR UPDATE.
+    """
+    conn = db.session.connection()
+    if conn.dialect.name == "sqlite":
+        # pysqlite only opens a transaction on the first write; one that is
+        # already open has written, so it holds the write lock already
+        if not conn.connection.dbapi_connection.in_transaction:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+    elif rows is not None:
+        conn.execute(rows.with_for_update()).all()
+
+
+def select_for_update(rows) -> list:
+    """The rows of `rows`, read under the write lock (the check itself locks them)."""
+    conn = db.session.connection()
+    if conn.dialect.name == "sqlite":
+        lock_for_write()
+    else:
+        rows = rows.with_for_update()
+    return conn.execute(rows).all()
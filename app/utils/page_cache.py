@@ -0,0 +1,150 @@
+import hashlib
+import os
+import threading
+from functools import wraps
+
+from flask import current_app, request, session
+from flask.signals import template_rendered
+from jinja2 import meta
+
+from ..i18n import LANGUAGES, get_lang
+from ..metrics import CACHE_LOOKUPS
+
+
+def cached_page(view):
+    """
+    Serve the view's output from memory for anonymous visitors.
+    Only for views whose HTML depends on nothing but the language.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        cache = current_app.extensions.get("page_cache")
+        if cache is None or not cache.cacheable():
+            return view(*args, **kwargs)
+        return cache.respond(request.endpoint, view, args, kwargs)
+
+    wrapper._page_cache = True
+    return wrapper
+
+
+class PageCache:
+    def __init__(self, app):
+        self.app = app
+        # (endpoint, lang, template mtimes) -> (body bytes, etag)
+        self.pages = {}
+        # endpoint -> template files the page is built from (page + parents)
+        self.sources = {}
+        # endpoint -> mtimes of those files when last checked
+        self.signatures = {}
+        self.lock = threading.Lock()
+
+    # --- Eligibility ---------------------------------------------------------
+
+    @staticmethod
+    def cacheable() -> bool:
+        if request.method not in ("GET", "HEAD"):
+            return False
+        # Logged-in users get their own navbar; pending flashes are rendered once.
+        # Checking the session avoids loading the user (no DB hit).
+        return "_user_id" not in session and not session.get("_flashes")
+
+    # --- Template sources ----------------------------------------------------
+
+    def _template_files(self, name: str, seen=None) -> list:
+        env = self.app.jinja_env
+        seen = seen if seen is not None else set()
+        if name in seen:
+            return []
+        seen.add(name)
+
+        source, filename, _ = env.loader.get_source(env, name)
+        files = [filename] if filename else []
+        for ref in meta.find_referenced_templates(env.parse(source)):
+            if ref:
+                files += self._template_files(ref, seen)
+        return files
+
+    def _signature(self, endpoint: str) -> tuple:
+        files = self.sources.get(endpoint, ())
+        return tuple(os.path.getmtime(f) for f in files if os.path.exists(f))
+
+    def _render(self, view, args, kwargs) -> tuple:
+        rendered = []
+
+        def _record(sender, template, context, **extra):
+            rendered.append(template.name)
+
+        with template_rendered.connected_to(_record, self.app):
+            body = view(*args, **kwargs)
+        if not isinstance(body, str):
+            return None, rendered
+        return body.encode("utf-8"), rendered
+
+    # --- Serving -------------------------------------------------------------
+
+    def respond(self, endpoint, view, args, kwargs):
+        lang = get_lang()
+        # Templates only change on deploy, except with auto-reload (dev)
+        check_mtime = self.app.jinja_env.auto_reload or endpoint not in self.sources
+        signature = self._signature(endpoint) if check_mtime else self.signatures[endpoint]
+        key = (endpoint, lang, signature)
+
+        page = self.pages.get(key)
+        CACHE_LOOKUPS.inc("page", "miss" if page is None else "hit")
+        if page is None:
+            body, templates = self._render(view, args, kwargs)
+            if body is None:
+                # Redirect / Response object: not a brochure page, don't cache
+                return view(*args, **kwargs)
+            with self.lock:
+                if endpoint not in self.sources:
+                    files = []
+                    for name in templates:
+                        files += self._template_files(name)
+                    self.sources[endpoint] = tuple(dict.fromkeys(files))
+                    signature = self._signature(endpoint)
+                    key = (endpoint, lang, signature)
+                self.signatures[endpoint] = signature
+                # Drop renders of older template versions
+                for old in [k for k in self.pages if k[:2] == (endpoint, lang) and k != key]:
+                    del self.pages[old]
+                page = self.pages[key] = (body, hashlib.sha1(body).hexdigest())
+
+        body, etag = page
+        response = current_app.response_class(body, mimetype="text/html")
+        response.set_etag(etag)
+        # Same URL, different language / navbar -> shared caches must not mix them
+        response.vary.update(("Cookie", "Accept-Language"))
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
+
+    def warm(self):
+        """Render every cached page in every language once (startup)."""
+        endpoints = [
+            (rule, self.app.view_functions[rule.endpoint])
+            for rule in self.app.url_map.iter_rules()
+            if getattr(self.app.view_functions.get(rule.endpoint), "_page_cache", False) and not rule.arguments
+        ]
+        for rule, view in endpoints:
+            for lang in LANGUAGES:
+                # get_lang() falls back to Accept-Language when the session has none
+                with self.app.test_request_context(rule.rule, headers={"Accept-Language": lang}):
+                    if get_lang() != lang:
+                        continue
+                    self.respond(rule.endpoint, getattr(view, "__wrapped__", view), (), {})
+        return len(self.pages)
+
+
+def init_page_cache(app):
+    """Call after the blueprints are registered."""
+    if os.getenv("PAGE_CACHE_ENABLED", "true").lower() != "true":
+        return None
+    cache = PageCache(app)
+    app.extensions["page_cache"] = cache
+    if os.getenv("PAGE_CACHE_WARM", "true").lower() == "true":
+        try:
+            app.logger.info("Page cache warmed: %s page(s)", cache.warm())
+        except Exception:
+            # A broken template should fail its own request, not the app start
+            app.logger.exception("Page cache warm-up failed")
+    return cache
@@ -0,0 +1,96 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Werkzeug method spec, stored as the prefix of every hash ("<method>$<salt>$<hash>").
+# Raise the cost here; existing hashes are upgraded on the user's next login.
+DEFAULT_METHOD = "scrypt:32768:8:1"
+# Hashes in flight (running + queued) before callers are turned away
+DEFAULT_MAX_PENDING = 32
+DEFAULT_WAIT_SECONDS = 5.0
+
+
+class PasswordServiceBusy(RuntimeError):
+    pass
+
+
+class PasswordHasher:
+    """
+    Runs the KDF on a small bounded thread pool. hashlib's scrypt/pbkdf2
+    release the GIL, so other requests keep being served while hashes run,
+    and at most `workers` cores are ever spent on hashing. When more than
+    `max_pending` hashes are waiting, callers get PasswordServiceBusy
+    (back-pressure) instead of piling up.
+    """
+
+    def __init__(self, method: str = DEFAULT_METHOD, workers: int = None,
+                 max_pending: int = DEFAULT_MAX_PENDING, wait_seconds: float = DEFAULT_WAIT_SECONDS):
+        self.method = method
+        # What Werkzeug actually writes: "scrypt" -> "scrypt:32768:8:1",
+        # "pbkdf2" -> "pbkdf2:sha256:600000". One hash at startup, and a bad
+        # method fails here instead of on the first sign-up.
+        self.prefix = generate_password_hash("x", method).split("$", 1)[0]
+        self.workers = workers or max(1, min(4, os.cpu_count() or 1))
+        self.wait_seconds = wait_seconds
+        self._slots = threading.BoundedSemaphore(max(max_pending, self.workers))
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(timeout=self.wait_seconds):
+            raise PasswordServiceBusy("Too many sign-ins in progress, please try again.")
+        try:
+            return self._pool.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash: str) -> bool:
+        return (pwhash or "").split("$", 1)[0] != self.prefix
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+
+def _hasher() -> PasswordHasher:
+    hasher = current_app.extensions.get("passwords")
+    if hasher is None:
+        hasher = current_app.extensions["passwords"] = PasswordHasher()
+    return hasher
+
+
+def hash_password(password: str) -> str:
+    return _hasher().hash(password)
+
+
+def verify_password(pwhash: str, password: str) -> bool:
+    return _hasher().verify(pwhash, password)
+
+
+def needs_rehash(pwhash: str) -> bool:
+    return _hasher().needs_rehash(pwhash)
+
+
+def verify_dummy(password: str):
+    """Spend the same time as a real check when the email is unknown."""
+    hasher = _hasher()
+    dummy = current_app.extensions.get("passwords_dummy_hash")
+    if dummy is None:
+        dummy = current_app.extensions["passwords_dummy_hash"] = hasher.hash("dummy-password")
+    hasher.verify(dummy, password)
+
+
+def init_passwords(app):
+    app.extensions["passwords"] = PasswordHasher(
+        method=os.getenv("PASSWORD_HASH_METHOD", DEFAULT_METHOD),
+        workers=int(os.getenv("PASSWORD_HASH_WORKERS", "0")) or None,
+        max_pending=int(os.getenv("PASSWORD_HASH_MAX_PENDING", DEFAULT_MAX_PENDING)),
+        wait_seconds=float(os.getenv("PASSWORD_HASH_WAIT_SECONDS", DEFAULT_WAIT_SECONDS)),
+    )
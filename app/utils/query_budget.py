@@ -0,0 +1,163 @@
+import contextvars
+import os
+from collections import Counter
+from functools import wraps
+
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Same statement text run this many times in one request -> N+1 warning
+REPEAT_THRESHOLD = 5
+
+# QueryLogs currently collecting (nested budgets all see every statement)
+_active = contextvars.ContextVar("query_logs", default=())
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryLog:
+    __slots__ = ("statements",)
+
+    def __init__(self):
+        self.statements = []  # [(statement, parameters repr)]
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, threshold: int = REPEAT_THRESHOLD) -> dict:
+        """{statement: runs} for statements run `threshold`+ times with different parameters."""
+        runs = Counter()
+        distinct = {}
+        for statement, parameters in self.statements:
+            runs[statement] += 1
+            distinct.setdefault(statement, set()).add(parameters)
+        return {s: n for s, n in runs.items() if n >= threshold and len(distinct[s]) > 1}
+
+    def summary(self, limit: int = 10) -> str:
+        counts = Counter(statement for statement, _ in self.statements)
+        return "\n".join(f"  {n}x {' '.join(s.split())[:200]}" for s, n in counts.most_common(limit))
+
+
+def _record(conn, cursor, statement, parameters, context, executemany):
+    logs = _active.get()
+    if logs:
+        entry = (statement, repr(parameters)[:200])
+        for log in logs:
+            log.statements.append(entry)
+
+
+def install_query_listener():
+    # On the Engine class: covers every app / engine a test suite creates
+    if not event.contains(Engine, "before_cursor_execute", _record):
+        event.listen(Engine, "before_cursor_execute", _record)
+
+
+def _mode(mode=None) -> str:
+    if mode:
+        return mode
+    if not has_app_context():
+        return "raise"
+    app = current_app
+    return app.config.get("QUERY_BUDGET_MODE") or ("raise" if app.testing or app.debug else "warn")
+
+
+class query_budget:
+    """
+    Fail when more than `max_queries` SQL statements run inside the block:
+
+        with query_budget(3):
+            client.get("/rent/tools")
+
+        @bp.route("/tools", methods=["GET", "POST"])
+        @login_required
+        @query_budget(3, methods=("GET",))
+        @query_budget(8, methods=("POST",))
+        def tools(): ...
+
+    mode "raise" (tests, debug) raises QueryBudgetExceeded, "warn" (the
+    production default) logs, "off" does nothing. Set QUERY_BUDGET_MODE to
+    override per app. As a view decorator, `methods` limits the budget to
+    those HTTP methods.
+    """
+
+    def __init__(self, max_queries: int, label: str = None, mode: str = None, methods=None):
+        self.max_queries = max_queries
+        self.label = label
+        self.mode = mode
+        self.methods = {m.upper() for m in methods} if methods else None
+        self.log = None
+        self._token = None
+
+    def __enter__(self) -> QueryLog:
+        install_query_listener()
+        self.log = QueryLog()
+        self._token = _active.set(_active.get() + (self.log,))
+        return self.log
+
+    def __exit__(self, exc_type, exc, tb):
+        _active.reset(self._token)
+        if exc_type is not None or self.log.count <= self.max_queries:
+            return False
+
+        mode = _mode(self.mode)
+        if mode == "off":
+            return False
+        message = (
+            f"{self.label or 'block'} ran {self.log.count} SQL statements, "
+            f"budget is {self.max_queries}:\n{self.log.summary()}"
+        )
+        if mode == "raise":
+            raise QueryBudgetExceeded(message)
+        if has_app_context():
+            current_app.logger.warning("Query budget exceeded: %s", message)
+        return False
+
+    def __call__(self, view):
+        label = self.label or view.__qualname__
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if self.methods is not None and request.method not in self.methods:
+                return view(*args, **kwargs)
+            # A fresh instance per call: concurrent requests share the decorator
+            with query_budget(self.max_queries, label, self.mode):
+                return view(*args, **kwargs)
+
+        return wrapper
+
+
+def init_query_budget(app):
+    """
+    Development aid: warn when a request runs the same statement
+    QUERY_REPEAT_THRESHOLD+ times with different parameters (the N+1
+    pattern - a lookup per row of a list). On by default with debug.
+    """
+    app.config.setdefault("QUERY_BUDGET_MODE", os.getenv("QUERY_BUDGET_MODE") or None)
+    install_query_listener()
+
+    enabled = os.getenv("QUERY_REPEAT_WARN", str(app.debug)).lower() == "true"
+    if not enabled:
+        return
+    threshold = int(os.getenv("QUERY_REPEAT_THRESHOLD", REPEAT_THRESHOLD))
+
+    @app.before_request
+    def _start_query_log():
+        log = QueryLog()
+        g._query_log = (log, _active.set(_active.get() + (log,)))
+
+    @app.teardown_request
+    def _check_query_log(exc):
+        entry = g.pop("_query_log", None)
+        if entry is None:
+            return
+        log, token = entry
+        _active.reset(token)
+        for statement, runs in log.repeated(threshold).items():
+            app.logger.warning(
+                "Possible N+1 in %s: statement ran %d times with different parameters: %s",
+                request.endpoint, runs, " ".join(statement.split())[:300],
+            )
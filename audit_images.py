@@ -0,0 +1,77 @@
+"""
+Report how catalog part numbers line up with static/products images.
+
+    python audit_images.py            # summary + lists
+    python audit_images.py --quiet    # summary only
+
+Sections:
+  missing   - Product/Tool part numbers with no image (placeholder is shown)
+  orphans   - image files that no Product/Tool part number resolves to
+  renamed   - files whose name only matches after normalization
+              (spaces, zero-width chars, non-ASCII suffixes, case)
+  broken    - image_mapping.csv rows pointing at files that don't exist
+"""
+import argparse
+import os
+
+from app import create_app
+from app.extensions import db
+from app.products.models import Product
+from app.rent.models import Tool
+from app.utils.images import build_image_index, normalize_part_number
+
+
+def audit_images(static_folder: str):
+    index = build_image_index(static_folder)
+
+    part_numbers = set(db.session.scalars(db.select(Product.part_number).where(Product.is_active.is_(True))))
+    part_numbers.update(
+        pn for pn in db.session.scalars(db.select(Tool.part_number).where(Tool.part_number.isnot(None))) if pn
+    )
+
+    missing = sorted(pn for pn in part_numbers if normalize_part_number(pn) not in index.by_part)
+
+    used_files = {index.by_part.get(normalize_part_number(pn)) for pn in part_numbers}
+    orphans = sorted(f for f in index.files if f not in used_files)
+
+    renamed = []
+    for f in index.files:
+        stem = os.path.splitext(f)[0]
+        if normalize_part_number(stem) != stem.upper():
+            renamed.append(f)
+
+    return {
+        "part_numbers": len(part_numbers),
+        "files": len(index.files),
+        "missing": missing,
+        "orphans": orphans,
+        "renamed": renamed,
+        "broken": index.broken_mappings,
+    }
+
+
+def print_section(title: str, rows):
+    print(f"\n{title} ({len(rows)})")
+    for row in rows:
+        print(f"  {row!r}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audit product images against the catalog.")
+    parser.add_argument("--quiet", action="store_true", help="Only print the summary line")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        report = audit_images(app.static_folder)
+
+    print(
+        f"Part numbers: {report['part_numbers']}, image files: {report['files']}, "
+        f"missing: {len(report['missing'])}, orphans: {len(report['orphans'])}, "
+        f"renamed: {len(report['renamed'])}, broken mappings: {len(report['broken'])}"
+    )
+    if not args.quiet:
+        print_section("Missing images", report["missing"])
+        print_section("Orphan files", report["orphans"])
+        print_section("Files matched only after normalization", report["renamed"])
+        print_section("Broken image_mapping.csv rows (model, file)", report["broken"])
@@ -0,0 +1,38 @@
+import argparse
+import time
+
+from flask import render_template
+
+from app import create_app
+from app.i18n import CATALOGS, DEFAULT_LANG, resolve_lang
+
+
+def legacy_t(key: str) -> str:
+    # The old behaviour: resolve the language (session + Accept-Language) on every call
+    return CATALOGS.get(resolve_lang(), CATALOGS[DEFAULT_LANG]).get(key, key)
+
+
+def time_renders(app, template: str, n: int, legacy: bool) -> float:
+    with app.test_request_context("/", headers={"Accept-Language": "mn,en;q=0.8"}):
+        extra = {"t": legacy_t} if legacy else {}
+        render_template(template, **extra)  # compile + warm up
+        started = time.perf_counter()
+        for _ in range(n):
+            render_template(template, **extra)
+        return (time.perf_counter() - started) / n
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-render cost of t() in templates.")
+    parser.add_argument("--template", default="main/home.html")
+    parser.add_argument("-n", type=int, default=2000, help="Renders per variant")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        old = time_renders(app, args.template, args.n, legacy=True)
+        new = time_renders(app, args.template, args.n, legacy=False)
+        print(f"{args.template}: {args.n} renders per variant")
+        print(f"  per-call language lookup: {old * 1e6:8.1f} µs/render")
+        print(f"  bound translator:         {new * 1e6:8.1f} µs/render")
+        print(f"✅ Saved {(old - new) * 1e6:.1f} µs/render ({(1 - new / old) * 100:.0f}%)")
@@ -0,0 +1,43 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils.passwords import PasswordHasher
+
+DEFAULT_METHODS = [
+    "scrypt:16384:8:1",
+    "scrypt:32768:8:1",
+    "scrypt:65536:8:1",
+    "pbkdf2:sha256:600000",
+]
+
+
+def bench(method: str, workers: int, logins: int, concurrency: int):
+    hasher = PasswordHasher(method=method, workers=workers, max_pending=concurrency, wait_seconds=60)
+    stored = hasher.hash("correct horse battery staple")
+
+    started = time.perf_counter()
+    hasher.verify(stored, "correct horse battery staple")
+    single = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as clients:
+        list(clients.map(lambda _: hasher.verify(stored, "correct horse battery staple"), range(logins)))
+    elapsed = time.perf_counter() - started
+    hasher.shutdown()
+    return single, logins / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cost vs. login throughput for password hash settings.")
+    parser.add_argument("methods", nargs="*", default=DEFAULT_METHODS, help="Werkzeug method specs")
+    parser.add_argument("--workers", type=int, default=0, help="Hash pool size (0 = min(4, CPUs))")
+    parser.add_argument("--logins", type=int, default=40, help="Verifications per method")
+    parser.add_argument("--concurrency", type=int, default=16, help="Simultaneous login requests")
+    args = parser.parse_args()
+
+    print(f"{'method':<24} {'ms/verify':>10} {'logins/s':>10}")
+    for method in args.methods:
+        single, throughput = bench(method, args.workers or None, args.logins, args.concurrency)
+        print(f"{method:<24} {single * 1000:>10.1f} {throughput:>10.1f}")
+    print("✅ Pick the slowest method whose logins/s still covers your peak; set PASSWORD_HASH_METHOD.")
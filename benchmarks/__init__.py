@@ -0,0 +1 @@
+# End-to-end benchmarks: python -m benchmarks --help
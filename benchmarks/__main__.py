@@ -0,0 +1,101 @@
+import argparse
+import logging
+import os
+import random
+from datetime import datetime
+
+from .fixtures import temp_database_url
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="End-to-end benchmarks for the hot routes.")
+    parser.add_argument("--mode", choices=("client", "http", "both"), default="both",
+                        help="Flask test client, a real WSGI server, or both")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=1, help="Parallel clients (http mode)")
+    parser.add_argument("--only", nargs="*", help="Scenario names to run")
+    parser.add_argument("--database", help="Benchmark an existing database instead of a generated one")
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--tools", type=int, default=300)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--output", help="Results JSON (default: benchmarks/results/<revision>-<time>.json)")
+    parser.add_argument("--compare", help="Earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    # Must be in place before create_app() reads the environment
+    os.environ["DATABASE_URL"] = args.database or temp_database_url()
+    os.environ.setdefault("MAIL_SUPPRESS_SEND", "true")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    from app import create_app
+    from app.extensions import db
+    from .fixtures import fixture_ids, load_fixture
+    from .harness import (HttpDriver, QueryCounter, TestClientDriver, WsgiServer, compare, git_revision,
+                          run_scenario, save_results)
+    from .scenarios import build_scenarios, login_form
+
+    app = create_app()
+    # Forms are posted without a rendered page, so no CSRF token to send
+    app.config["WTF_CSRF_ENABLED"] = False
+
+    with app.app_context():
+        if not args.database:
+            load_fixture(args.products, args.tools, args.users)
+        tool_ids, emails, terms = fixture_ids()
+        counter = QueryCounter(db.engine)
+    if not tool_ids or not emails:
+        parser.error("The database has no tools or bench users; run without --database to generate them.")
+
+    scenarios = build_scenarios(tool_ids, emails, terms)
+    if args.only:
+        scenarios = [s for s in scenarios if s.name in args.only]
+
+    def client_factory(make_driver):
+        def make_client(auth):
+            client = make_driver()
+            if auth:
+                client.request("POST", "/auth/login", login_form(random.choice(emails)))
+            return client
+        return make_client
+
+    modes = ("client", "http") if args.mode == "both" else (args.mode,)
+    results = []
+    for mode in modes:
+        print(f"\n== {mode} ==")
+        print(f"{'scenario':<18} {'reqs':>5} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'SQL/req':>8}")
+        if mode == "client":
+            make_client = client_factory(lambda: TestClientDriver(app))
+            runs = [run_scenario(s, make_client, counter, args.requests) for s in scenarios]
+        else:
+            with WsgiServer(app) as server:
+                make_client = client_factory(lambda: HttpDriver(server.base_url))
+                runs = [run_scenario(s, make_client, counter, args.requests, args.concurrency) for s in scenarios]
+        for r in runs:
+            sql = "-" if r.queries_per_request is None else r.queries_per_request
+            print(f"{r.name:<18} {r.requests:>5} {r.errors:>4} {r.p50_ms:>8} {r.p95_ms:>8} {r.p99_ms:>8} {r.rps:>8} {sql:>8}")
+            if r.errors:
+                print(f"{'':<18} unexpected response, e.g. {r.error_sample}")
+        results += [r._replace(name=f"{mode}:{r.name}") for r in runs]
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{git_revision()}-{datetime.utcnow():%Y%m%dT%H%M%S}.json"
+    )
+    save_results(output, args.mode, results, {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "database": "existing" if args.database else
+                    {"products": args.products, "tools": args.tools, "users": args.users},
+    })
+    print(f"\n✅ Results saved to {output}")
+
+    if args.compare:
+        print(f"\nvs {args.compare}:")
+        for line in compare(results, args.compare):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
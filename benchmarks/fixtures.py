@@ -0,0 +1,70 @@
+import os
+import random
+import tempfile
+
+from sqlalchemy import insert
+
+from app.extensions import db
+from app.models import User
+from app.products.models import Product
+from app.rent.models import Tool
+from app.utils.passwords import hash_password
+
+BENCH_PASSWORD = "benchmark-pass"
+CHUNK_SIZE = 1000
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+
+def temp_database_url() -> str:
+    path = os.path.join(tempfile.mkdtemp(prefix="gs-bench-"), "bench.db")
+    return f"sqlite:///{path}"
+
+
+def _bulk(model, rows):
+    for i in range(0, len(rows), CHUNK_SIZE):
+        db.session.execute(insert(model), rows[i:i + CHUNK_SIZE])
+
+
+def load_fixture(products: int = 5000, tools: int = 300, users: int = 100, seed: int = 42):
+    """Migrate an empty database and fill it with deterministic test data."""
+    from flask_migrate import upgrade
+    upgrade(directory=MIGRATIONS_DIR)
+
+    rnd = random.Random(seed)
+    _bulk(Product, [
+        {
+            "part_number": f"48-{rnd.randint(10, 99)}-{i:05d}",
+            "description": f"M18 {rnd.choice(['FUEL', 'REDLITHIUM', 'PACKOUT', 'SHOCKWAVE'])} "
+                           f"{rnd.choice(['drill', 'impact driver', 'blade', 'battery', 'socket set'])} {i}",
+            "uom": "EA",
+            "unit_price_mnt": rnd.randint(5_000, 2_500_000),
+            "is_active": True,
+        }
+        for i in range(products)
+    ])
+    tool_rows = []
+    for i in range(tools):
+        price = rnd.randint(10, 200) * 1000
+        tool_rows.append({
+            "part_number": f"M18 F{rnd.choice(['ID', 'PD', 'HX', 'CS'])}{rnd.randint(1, 3)}-{i:03d}",
+            "name": f"Tool {i:05d}",
+            "daily_price": price,
+            "daily_price_8_30": int(price * 0.8),
+            "available_qty": rnd.randint(3, 20),
+        })
+    _bulk(Tool, tool_rows)
+    # One KDF run for everybody: the fixture should not take minutes
+    pwhash = hash_password(BENCH_PASSWORD)
+    _bulk(User, [
+        {"name": f"Bench User {i}", "email": f"bench{i}@example.com", "password_hash": pwhash, "is_admin": False}
+        for i in range(users)
+    ])
+    db.session.commit()
+
+
+def fixture_ids():
+    """(tool ids, user emails, search terms) the scenarios pick from."""
+    tool_ids = db.session.scalars(db.select(Tool.id)).all()
+    emails = db.session.scalars(db.select(User.email).where(User.email.like("bench%@example.com"))).all()
+    return tool_ids, emails, ["drill", "48-22", "battery", "m18 fuel"]
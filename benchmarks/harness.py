@@ -0,0 +1,234 @@
+import http.cookiejar
+import json
+import os
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import event
+
+# One measured route: `prepare(client)` runs untimed before every request
+# (e.g. filling a cart), `data()` builds the form body, `auth` = logged in.
+# `expect` = (status, Location prefix or None): the response of a request
+# that did its job. Anything else counts as an error - a rejected form
+# usually answers 200 (re-render) or 302 back to itself, not 4xx.
+Scenario = namedtuple("Scenario", "name method path data prepare auth expect")
+Scenario.__new__.__defaults__ = ((200, None),)
+
+Result = namedtuple(
+    "Result", "name requests errors p50_ms p95_ms p99_ms mean_ms rps queries_per_request error_sample"
+)
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class QueryCounter:
+    """Counts SQL statements sent by the engine (all threads)."""
+
+    def __init__(self, engine):
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        with self._lock:
+            self.count += 1
+
+
+# --- Clients -----------------------------------------------------------------
+# Both expose request(method, path, data) -> (status, Location path or None)
+# and follow no redirects, so each sample is exactly one request to the
+# route under test.
+
+def _location_path(location):
+    if not location:
+        return None
+    parts = urllib.parse.urlsplit(location)
+    return parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+class TestClientDriver:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method: str, path: str, data=None) -> tuple:
+        response = self.client.open(path, method=method, data=data)
+        return response.status_code, _location_path(response.headers.get("Location"))
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpDriver:
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect()
+        )
+
+    def request(self, method: str, path: str, data=None) -> tuple:
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        req = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with self.opener.open(req, timeout=60) as resp:
+                resp.read()
+                return resp.status, _location_path(resp.headers.get("Location"))
+        except urllib.error.HTTPError as e:
+            # Refused redirects land here too
+            e.read()
+            return e.code, _location_path(e.headers.get("Location"))
+
+
+class WsgiServer:
+    """The app on a real (threaded Werkzeug) HTTP server in a background thread."""
+
+    def __init__(self, app, host: str = "127.0.0.1", port: int = 0):
+        from werkzeug.serving import make_server
+        self.server = make_server(host, port, app, threaded=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.server.host}:{self.server.port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+
+
+# --- Running -----------------------------------------------------------------
+
+def as_expected(scenario: Scenario, status: int, location) -> bool:
+    expected_status, location_prefix = scenario.expect
+    if status != expected_status:
+        return False
+    return location_prefix is None or (location or "").startswith(location_prefix)
+
+
+def run_scenario(scenario: Scenario, make_client, counter: QueryCounter, requests: int, concurrency: int = 1,
+                 warmup: int = 3) -> Result:
+    """
+    `make_client(auth)` returns a ready driver (logged in when auth=True).
+    Each worker thread gets its own client; login and warm-up happen before
+    the clock starts. SQL counts are taken around each request, so they are
+    exact with concurrency=1 and reported as None otherwise. A response
+    other than `scenario.expect` is an error; the first one is kept as
+    `error_sample`.
+    """
+    workers = max(1, min(concurrency, requests))
+    per_worker = [requests // workers + (1 if i < requests % workers else 0) for i in range(workers)]
+    ready = threading.Barrier(workers + 1)
+    latencies = []
+    queries = [0]
+    errors = [0]
+    error_sample = []
+    lock = threading.Lock()
+
+    def call(client):
+        if scenario.prepare:
+            scenario.prepare(client)
+        data = scenario.data() if scenario.data else None
+        before = counter.count
+        started = time.perf_counter()
+        status, location = client.request(scenario.method, scenario.path, data)
+        return time.perf_counter() - started, counter.count - before, status, location
+
+    def worker(n):
+        client = make_client(scenario.auth)
+        for _ in range(warmup):
+            call(client)
+        ready.wait()
+        local, local_queries, local_errors = [], 0, 0
+        for _ in range(n):
+            seconds, q, status, location = call(client)
+            local.append(seconds)
+            local_queries += q
+            if not as_expected(scenario, status, location):
+                local_errors += 1
+                if not error_sample:
+                    error_sample.append(f"{status} {location or ''}".strip())
+        with lock:
+            latencies.extend(local)
+            queries[0] += local_queries
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in per_worker]
+    for t in threads:
+        t.start()
+    ready.wait()
+    started = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    n = len(latencies) or 1
+    return Result(
+        name=scenario.name,
+        requests=len(latencies),
+        errors=errors[0],
+        p50_ms=round(percentile(latencies, 50) * 1000, 2),
+        p95_ms=round(percentile(latencies, 95) * 1000, 2),
+        p99_ms=round(percentile(latencies, 99) * 1000, 2),
+        mean_ms=round(sum(latencies) / n * 1000, 2),
+        rps=round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        queries_per_request=round(queries[0] / n, 2) if workers == 1 else None,
+        error_sample=error_sample[0] if error_sample else None,
+    )
+
+
+# --- Results files -----------------------------------------------------------
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(path: str, mode: str, results, meta: dict) -> str:
+    payload = {
+        "revision": git_revision(),
+        "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "mode": mode,
+        **meta,
+        "results": {r.name: r._asdict() for r in results},
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    return path
+
+
+def compare(results, baseline_path: str):
+    """Lines like 'tool_rent  p95 12.3 -> 15.1 ms (+23%)' against an older results file."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    lines = []
+    for r in results:
+        old = baseline.get(r.name)
+        if not old:
+            continue
+        for key in ("p50_ms", "p95_ms", "queries_per_request"):
+            before, after = old[key], getattr(r, key)
+            if before is None or after is None:
+                continue
+            change = f"{(after - before) / before * 100:+.0f}%" if before else "n/a"
+            lines.append(f"{r.name:<22} {key:<20} {before:>9} -> {after:<9} ({change})")
+    return lines
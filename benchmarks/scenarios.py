@@ -0,0 +1,47 @@
+import random
+from datetime import date, timedelta
+
+from .fixtures import BENCH_PASSWORD
+from .harness import Scenario
+
+
+def _window(rnd):
+    start = date.today() + timedelta(days=rnd.randint(30, 700))
+    return start.isoformat(), (start + timedelta(days=rnd.randint(0, 6))).isoformat()
+
+
+def build_scenarios(tool_ids, emails, search_terms, seed: int = 7) -> list:
+    rnd = random.Random(seed)
+
+    def rent_form():
+        start, end = _window(rnd)
+        return {"tool_id": rnd.choice(tool_ids), "start_date": start, "end_date": end, "quantity": 1}
+
+    def fill_cart(client):
+        for _ in range(3):
+            client.request("POST", "/rent/cart/add", rent_form())
+
+    def logout(client):
+        client.request("GET", "/auth/logout")
+
+    return [
+        Scenario("home", "GET", "/", None, None, False),
+        Scenario("products", "GET", "/milwaukee/products", None, None, False),
+        Scenario("products_search", "GET", f"/milwaukee/products?q={rnd.choice(search_terms)}", None, None, False),
+        Scenario("products_api", "GET", "/api/v1/products?limit=50", None, None, False),
+        Scenario("tool_rent", "GET", "/milwaukee/tool_rent", None, None, True),
+        Scenario("rent_tools", "GET", "/rent/tools", None, None, True),
+        # Success redirects to the new order's payment page; a rejection goes back to the form
+        Scenario("rent_post", "POST", "/rent/tools", rent_form, None, True, (302, "/checkout/")),
+        Scenario("checkout", "POST", "/milwaukee/tool_rent/checkout", None, fill_cart, True, (302, "/checkout/")),
+        # A failed login re-renders the form with 200
+        Scenario("login", "POST", "/auth/login", lambda: login_form(rnd.choice(emails)), logout, False, (302, "/")),
+        Scenario("contact_submit", "POST", "/contact/", lambda: {
+            "name": "Bench", "email": "bench-contact@example.com",
+            "subject": "Benchmark", "message": "Load test message from the benchmark suite.",
+        }, None, False, (302, "/contact/")),
+    ]
+
+
+def login_form(email: str) -> dict:
+    return {"email": email, "password": BENCH_PASSWORD}
@@ -0,0 +1,173 @@
+"""
+Build resized product thumbnails (PNG + WebP) with content-hashed names.
+
+    python build_images.py                 # incremental
+    python build_images.py --force         # rebuild everything
+    python build_images.py --widths 160,320
+
+Reads   static/products/*.png
+Writes  static/build/products/<stem>-<width>.<hash>.<ext>
+        static/build/products/manifest.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from io import BytesIO
+
+from PIL import Image
+
+from app.utils.images import BUILD_DIR, MANIFEST_NAME
+
+SOURCE_DIR = os.path.join("static", "products")
+OUTPUT_DIR = os.path.join("static", *BUILD_DIR.split("/"))
+
+# Cards show images in a 150px box -> 1x / 2x / 3x
+DEFAULT_WIDTHS = (160, 320, 480)
+WEBP_QUALITY = 80
+
+
+def file_hash(data: bytes, length: int = 10) -> str:
+    return hashlib.sha1(data).hexdigest()[:length]
+
+
+def resize(img: Image.Image, width: int) -> Image.Image:
+    if img.width <= width:
+        return img.copy()
+    height = max(1, round(img.height * width / img.width))
+    return img.resize((width, height), Image.LANCZOS)
+
+
+def encode(img: Image.Image, fmt: str) -> bytes:
+    buf = BytesIO()
+    if fmt == "webp":
+        img.save(buf, "WEBP", quality=WEBP_QUALITY, method=6)
+    else:
+        img.save(buf, "PNG", optimize=True)
+    return buf.getvalue()
+
+
+def write_variant(stem: str, width: int, fmt: str, data: bytes) -> str:
+    name = f"{stem}-{width}.{file_hash(data)}.{fmt}"
+    path = os.path.join(OUTPUT_DIR, name)
+    if not os.path.exists(path):
+        with open(path, "wb") as f:
+            f.write(data)
+    return f"{BUILD_DIR}/{name}"
+
+
+def build_one(src_path: str, stem: str, source_hash: str, widths) -> dict:
+    with Image.open(src_path) as im:
+        im.load()
+        img = im.convert("RGBA") if im.mode not in ("RGB", "RGBA") else im.copy()
+
+    entry = {
+        "source": os.path.basename(src_path),
+        "source_hash": source_hash,
+        "png": {},
+        "webp": {},
+    }
+    seen_widths = set()
+    for width in sorted(widths):
+        thumb = resize(img, width)
+        # Don't emit duplicate variants for images smaller than the larger widths
+        if thumb.width in seen_widths:
+            continue
+        seen_widths.add(thumb.width)
+
+        entry["png"][str(thumb.width)] = write_variant(stem, thumb.width, "png", encode(thumb, "png"))
+        entry["webp"][str(thumb.width)] = write_variant(stem, thumb.width, "webp", encode(thumb, "webp"))
+
+        if "thumb_width" not in entry:
+            entry["thumb_width"], entry["thumb_height"] = thumb.size
+
+    return entry
+
+
+def load_previous_manifest() -> dict:
+    path = os.path.join(OUTPUT_DIR, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def remove_stale_files(manifest_images: dict):
+    keep = {MANIFEST_NAME}
+    for entry in manifest_images.values():
+        for fmt in ("png", "webp"):
+            keep.update(p.rsplit("/", 1)[-1] for p in entry.get(fmt, {}).values())
+
+    removed = 0
+    for name in os.listdir(OUTPUT_DIR):
+        if name not in keep:
+            os.remove(os.path.join(OUTPUT_DIR, name))
+            removed += 1
+    return removed
+
+
+def build_images(widths=DEFAULT_WIDTHS, force: bool = False):
+    if not os.path.isdir(SOURCE_DIR):
+        raise FileNotFoundError(f"Image folder not found: {SOURCE_DIR}")
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    previous = load_previous_manifest()
+    prev_images = previous.get("images", {}) if previous.get("widths") == list(widths) else {}
+
+    images = {}
+    built = 0
+    skipped = 0
+    src_bytes = 0
+    out_bytes = 0
+
+    for name in sorted(os.listdir(SOURCE_DIR)):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() != ".png":
+            continue
+
+        src_path = os.path.join(SOURCE_DIR, name)
+        with open(src_path, "rb") as f:
+            source_hash = file_hash(f.read())
+
+        old = prev_images.get(stem)
+        outputs_exist = old and all(
+            os.path.exists(os.path.join("static", p))
+            for fmt in ("png", "webp") for p in old.get(fmt, {}).values()
+        )
+        if not force and old and old.get("source_hash") == source_hash and outputs_exist:
+            images[stem] = old
+            skipped += 1
+        else:
+            images[stem] = build_one(src_path, stem, source_hash, widths)
+            built += 1
+
+        src_bytes += os.path.getsize(src_path)
+        smallest = min(images[stem]["webp"], key=int)
+        out_bytes += os.path.getsize(os.path.join("static", images[stem]["webp"][smallest]))
+
+    manifest = {"widths": list(widths), "images": images}
+    with open(os.path.join(OUTPUT_DIR, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+    removed = remove_stale_files(images)
+    return built, skipped, removed, src_bytes, out_bytes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build product image thumbnails + manifest.")
+    parser.add_argument("--widths", default=",".join(str(w) for w in DEFAULT_WIDTHS),
+                        help="Comma-separated thumbnail widths in px (default: %(default)s)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the source is unchanged")
+    args = parser.parse_args()
+
+    widths = tuple(sorted({int(w) for w in args.widths.split(",") if w.strip()}))
+
+    started = time.perf_counter()
+    built, skipped, removed, src_bytes, out_bytes = build_images(widths, force=args.force)
+    elapsed = time.perf_counter() - started
+
+    print(f"✅ Images built: {built}, unchanged: {skipped}, stale removed: {removed} ({elapsed:.1f}s)")
+    if out_bytes:
+        print(f"   Originals: {src_bytes / 1024 / 1024:.1f} MB -> smallest WebP set: "
+              f"{out_bytes / 1024 / 1024:.2f} MB ({src_bytes / out_bytes:.0f}x smaller)")
@@ -0,0 +1,390 @@
+import argparse
+import math
+import random
+import string
+import time
+from array import array
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import func, text
+
+from app import create_app
+from app.catalog.versioning import SCOPES, bump
+from app.ledger.balances import rebuild as rebuild_ledger
+from app.extensions import db
+from app.models import User
+from app.payments.models import Order, Payment
+from app.products.models import Product
+from app.products.search import FTS_DROP, ensure_search_index
+from app.rent.availability import RELEASED_STATUSES
+from app.rent.models import RentalRequest, Tool
+from app.rent.pricing import calc_days, daily_rate
+from app.utils.passwords import hash_password
+
+# Rows per executemany INSERT
+CHUNK_SIZE = 5000
+# Rental starts: this many days back .. ahead of today
+HISTORY_DAYS = 730
+AHEAD_DAYS = 60
+MAX_RENTAL_DAYS = 30
+# Random tools tried for a rental line before it is dropped (tool fully booked)
+TOOL_PICKS = 5
+
+GenerateResult = namedtuple("GenerateResult", "products tools users orders rentals payments seconds")
+
+# --- Value pools -------------------------------------------------------------
+
+PLATFORMS = ["M12", "M18", "MX FUEL"]
+PLATFORM_WEIGHTS = [35, 60, 5]
+MODEL_CODES = ["FID", "FPD", "FDD", "FHX", "FCS", "FMT", "FSAG", "FHIW", "FIW", "FBJS", "FCHS", "FPP", "BLID", "BPD", "CH", "HCC"]
+KIT_SUFFIXES = ["0X0", "0", "502X", "502C", "22", "21", "0C0", "422X"]
+CATEGORIES = [
+    ("drill", ["Hammer Drill", "Drill Driver", "Right Angle Drill"]),
+    ("driver", ["Impact Driver", "Hydraulic Driver", "Screwdriver"]),
+    ("wrench", ["Impact Wrench", "Ratchet", "Torque Wrench"]),
+    ("saw", ["Circular Saw", "Reciprocating Saw", "Band Saw", "Jig Saw"]),
+    ("grinder", ["Angle Grinder", "Die Grinder", "Straight Grinder"]),
+    ("accessory", ["Drill Bit Set", "Saw Blade", "Socket Set", "Bit Holder", "Grinding Disc"]),
+    ("storage", ["PACKOUT Rolling Box", "PACKOUT Organizer", "Tool Bag"]),
+    ("power", ["REDLITHIUM Battery 5.0Ah", "REDLITHIUM Battery 12.0Ah", "Rapid Charger"]),
+]
+UOMS = ["EA"] * 17 + ["PK", "SET", "BX"]
+
+FIRST_NAMES = ["Bat", "Bold", "Saraa", "Anu", "Tuya", "Ganaa", "Enkh", "Oyun", "Temuulen", "Nomin",
+               "John", "Maria", "Alex", "Sara", "David", "Emma", "Chen", "Yuki", "Omar", "Lena"]
+LAST_NAMES = ["Erdene", "Batbayar", "Ganbold", "Dorj", "Tsend", "Purev", "Smith", "Kim", "Lee", "Brown",
+              "Garcia", "Tanaka", "Wang", "Mueller", "Ivanov", "Khan"]
+EMAIL_DOMAINS = ["gmail.com", "yahoo.com", "mail.mn", "greystone.mn", "outlook.com", "company.mn"]
+
+ORDER_STATUSES = ["completed", "paid", "pending", "cancelled"]
+ORDER_STATUS_WEIGHTS = [55, 20, 15, 10]
+PAYMENT_FOR_ORDER = {"completed": "paid", "paid": "paid", "pending": "unpaid", "cancelled": "failed"}
+
+
+def lognormal_price(rnd, median: int, sigma: float, step: int = 100) -> int:
+    return max(step, int(round(rnd.lognormvariate(math.log(median), sigma) / step)) * step)
+
+
+def rental_days(rnd) -> int:
+    # Mostly a day or a weekend, a long tail of monthly rentals
+    return min(MAX_RENTAL_DAYS, 1 + int(rnd.expovariate(1 / 3.0)))
+
+
+# --- Generators (one chunk of row dicts at a time) ---------------------------
+
+def part_number(rnd) -> str:
+    kind = rnd.random()
+    if kind < 0.5:
+        # Accessory style: 48-22-8714
+        return f"{rnd.randint(10, 49)}-{rnd.randint(10, 99)}-{rnd.randint(0, 9999):04d}"
+    if kind < 0.8:
+        # Tool style: M18 FID3-0X0
+        platform = rnd.choices(PLATFORMS, PLATFORM_WEIGHTS)[0]
+        return f"{platform} {rnd.choice(MODEL_CODES)}{rnd.randint(1, 3)}-{rnd.choice(KIT_SUFFIXES)}"
+    # Legacy model number: 2767-20
+    return f"{rnd.randint(2000, 3099)}-{rnd.randint(20, 29)}"
+
+
+def unique_part_numbers(rnd, n: int, taken: set):
+    while n:
+        pn = part_number(rnd)
+        if pn in taken:
+            # Short formats run out quickly at scale; the long one practically never does
+            pn = f"{rnd.randint(10, 49)}-{rnd.randint(10, 99)}-{rnd.randint(0, 9999):04d}"
+            if pn in taken:
+                continue
+        taken.add(pn)
+        n -= 1
+        yield pn
+
+
+def product_rows(rnd, n: int, taken: set):
+    for pn in unique_part_numbers(rnd, n, taken):
+        group, names = rnd.choice(CATEGORIES)
+        accessory = group in ("accessory", "storage")
+        yield {
+            "part_number": pn,
+            "description": f"{pn.split('-')[0] if pn.startswith('M') else 'Milwaukee'} {rnd.choice(names)}",
+            "uom": rnd.choice(UOMS),
+            "unit_price_mnt": lognormal_price(rnd, 60_000 if accessory else 650_000, 0.8),
+            "is_active": rnd.random() > 0.02,
+        }
+
+
+def tool_rows(rnd, n: int, start_id: int, taken: set):
+    for i, pn in enumerate(unique_part_numbers(rnd, n, taken)):
+        _, names = rnd.choice(CATEGORIES[:5])
+        price = lognormal_price(rnd, 35_000, 0.6, step=1000)
+        yield {
+            "id": start_id + i,
+            "part_number": pn,
+            "name": f"{rnd.choice(names)} {pn}",
+            "description": None,
+            "daily_price": price,
+            "daily_price_8_30": int(price * rnd.uniform(0.75, 0.9)) // 1000 * 1000 or None,
+            "available_qty": rnd.choices([1, 2, 3, 5, 10], [40, 25, 15, 12, 8])[0],
+        }
+
+
+def user_rows(rnd, n: int, start_id: int, pwhash: str, now: datetime):
+    for i in range(n):
+        first, last = rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES)
+        uid = start_id + i
+        yield {
+            "id": uid,
+            "name": f"{first} {last}",
+            # id keeps emails unique without a lookup
+            "email": f"{first.lower()}.{last.lower()}{uid}@{rnd.choice(EMAIL_DOMAINS)}",
+            "password_hash": pwhash,
+            "is_admin": False,
+            "created_at": now - timedelta(seconds=rnd.randint(0, 3 * 365 * 86400)),
+        }
+
+
+class StockCalendar:
+    """
+    Units booked per tool per day over [first_day, last_day], so generated
+    rentals never book a tool past its available_qty - the same rule
+    checkout enforces.
+    """
+
+    def __init__(self, first_day: date, last_day: date):
+        self.first_day = first_day
+        self.days = (last_day - first_day).days + 1
+        self.booked = {}  # tool_id -> array of units per day
+
+    def _row(self, tool_id: int):
+        row = self.booked.get(tool_id)
+        if row is None:
+            row = self.booked[tool_id] = array("i", [0]) * self.days
+        return row
+
+    def _span(self, start: date, end: date):
+        return max((start - self.first_day).days, 0), min((end - self.first_day).days, self.days - 1)
+
+    def fits(self, tool, start: date, end: date, qty: int) -> bool:
+        first, last = self._span(start, end)
+        return max(self._row(tool.id)[first:last + 1]) + qty <= (tool.available_qty or 0)
+
+    def book(self, tool_id: int, start: date, end: date, qty: int):
+        row = self._row(tool_id)
+        first, last = self._span(start, end)
+        for day in range(first, last + 1):
+            row[day] += qty
+
+    def load(self, conn):
+        """Rentals already in the database (appending to an existing dataset)."""
+        last_day = self.first_day + timedelta(days=self.days - 1)
+        rows = conn.execute(
+            db.select(RentalRequest.tool_id, RentalRequest.start_date, RentalRequest.end_date, RentalRequest.quantity)
+            .outerjoin(Order, Order.id == RentalRequest.order_id)
+            .where(
+                RentalRequest.end_date >= self.first_day,
+                RentalRequest.start_date <= last_day,
+                func.coalesce(Order.status, "").notin_(RELEASED_STATUSES),
+            )
+        )
+        for tool_id, start, end, qty in rows:
+            self.book(tool_id, start, end, qty or 0)
+
+
+def rental_rows(rnd, n: int, order_start_id: int, user_ids: range, tools: list, today: date,
+                calendar: StockCalendar):
+    """
+    Yields (order, [payment], [rental requests]) until `n` rental lines were
+    drawn. Lines that hold stock are booked in `calendar`; a line that no
+    tool has room for after TOOL_PICKS tries is dropped, so a crowded
+    calendar yields fewer rentals than asked for.
+    """
+    order_id = order_start_id
+    made = 0
+    while made < n:
+        lines = min(n - made, rnd.choices([1, 2, 3], [70, 22, 8])[0])
+        made += lines
+        status = rnd.choices(ORDER_STATUSES, ORDER_STATUS_WEIGHTS)[0]
+        holds_stock = status not in RELEASED_STATUSES
+        user_id = rnd.choice(user_ids)
+        # Two years of history plus bookings up to two months ahead
+        start = today + timedelta(days=rnd.randint(-HISTORY_DAYS, AHEAD_DAYS))
+        created = datetime.combine(start - timedelta(days=rnd.randint(0, 14)), datetime.min.time()) + timedelta(
+            seconds=rnd.randint(0, 86399))
+
+        rentals = []
+        total = 0
+        for _ in range(lines):
+            end = start + timedelta(days=rental_days(rnd) - 1)
+            for _ in range(TOOL_PICKS):
+                tool = rnd.choice(tools)
+                qty = 1 if tool.available_qty == 1 else rnd.choices([1, 2], [85, 15])[0]
+                if not holds_stock or calendar.fits(tool, start, end, qty):
+                    break
+            else:
+                continue
+            if holds_stock:
+                calendar.book(tool.id, start, end, qty)
+            days = calc_days(start, end)
+            cost = daily_rate(tool, days)[1] * days * qty
+            total += cost
+            rentals.append({
+                "user_id": user_id, "tool_id": tool.id, "start_date": start, "end_date": end,
+                "quantity": qty, "days": days, "total_cost": cost, "order_id": order_id, "created_at": created,
+            })
+        if not rentals:
+            continue
+
+        order = {"id": order_id, "user_id": user_id, "total_amount": total, "status": status, "created_at": created}
+        payment = {
+            "order_id": order_id,
+            "method": rnd.choice(["qpay", "bank"]) if status != "pending" else None,
+            "amount": total,
+            "status": PAYMENT_FOR_ORDER[status],
+            "bank_reference": "".join(rnd.choices(string.ascii_uppercase + string.digits, k=12)),
+            "created_at": created,
+        }
+        yield order, payment, rentals
+        order_id += 1
+
+
+# --- Loading -----------------------------------------------------------------
+
+def _insert(conn, model, rows, chunk_size: int) -> int:
+    table = model.__table__
+    count = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            conn.execute(table.insert(), chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        conn.execute(table.insert(), chunk)
+        count += len(chunk)
+    return count
+
+
+def _next_id(conn, model) -> int:
+    return (conn.execute(db.select(func.max(model.id))).scalar() or 0) + 1
+
+
+def generate(products: int = 0, tools: int = 0, users: int = 0, rentals: int = 0,
+             seed: int = 1, chunk_size: int = CHUNK_SIZE, log=print) -> GenerateResult:
+    """
+    Append synthetic data at the given scale. Core executemany INSERTs in one
+    transaction; on SQLite the product FTS triggers are dropped during the
+    load and the index is rebuilt once at the end.
+    """
+    started = time.perf_counter()
+    rnd = random.Random(seed)
+    today = date.today()
+    now = datetime.utcnow()
+    is_sqlite = db.engine.dialect.name == "sqlite"
+    counts = dict(products=0, tools=0, users=0, orders=0, rentals=0, payments=0)
+
+    with db.engine.connect() as conn:
+        if is_sqlite:
+            # Bulk load: crash safety of this transaction is not worth an fsync per page.
+            # SQLite won't change it inside a transaction: switch before, restore after.
+            synchronous = conn.exec_driver_sql("PRAGMA synchronous").scalar()
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+            conn.commit()
+        try:
+            with conn.begin():
+                if is_sqlite and products:
+                    for stmt in FTS_DROP:
+                        conn.execute(text(stmt))
+
+                if products:
+                    taken = set(conn.execute(db.select(Product.part_number)).scalars())
+                    counts["products"] = _insert(conn, Product, product_rows(rnd, products, taken), chunk_size)
+                    log(f"  products: {counts['products']}")
+
+                if tools:
+                    taken = {pn for pn in conn.execute(db.select(Tool.part_number)).scalars() if pn}
+                    counts["tools"] = _insert(conn, Tool, tool_rows(rnd, tools, _next_id(conn, Tool), taken),
+                                              chunk_size)
+                    log(f"  tools: {counts['tools']}")
+
+                if users:
+                    pwhash = hash_password("password123")  # one KDF run shared by every generated user
+                    counts["users"] = _insert(conn, User, user_rows(rnd, users, _next_id(conn, User), pwhash, now),
+                                              chunk_size)
+                    log(f"  users: {counts['users']}")
+
+                if rentals:
+                    tool_list = [SimpleNamespace(**row._mapping) for row in conn.execute(
+                        db.select(Tool.id, Tool.daily_price, Tool.daily_price_8_30, Tool.available_qty))]
+                    first_user, last_user = conn.execute(db.select(func.min(User.id), func.max(User.id))).one()
+                    if not tool_list or first_user is None:
+                        raise ValueError(
+                            "Rentals need existing tools and users (generate them first or in the same run)."
+                        )
+
+                    calendar = StockCalendar(today - timedelta(days=HISTORY_DAYS),
+                                             today + timedelta(days=AHEAD_DAYS + MAX_RENTAL_DAYS))
+                    calendar.load(conn)
+                    orders, payments, lines = [], [], []
+
+                    def flush():
+                        conn.execute(Order.__table__.insert(), orders)
+                        conn.execute(Payment.__table__.insert(), payments)
+                        conn.execute(RentalRequest.__table__.insert(), lines)
+                        counts["orders"] += len(orders)
+                        counts["payments"] += len(payments)
+                        counts["rentals"] += len(lines)
+                        orders.clear()
+                        payments.clear()
+                        lines.clear()
+
+                    next_log = 100_000
+                    for order, payment, rental_lines in rental_rows(
+                        rnd, rentals, _next_id(conn, Order), range(first_user, last_user + 1), tool_list, today, calendar
+                    ):
+                        orders.append(order)
+                        payments.append(payment)
+                        lines.extend(rental_lines)
+                        if len(lines) >= chunk_size:
+                            flush()
+                            if counts["rentals"] >= next_log:
+                                log(f"  rentals: {counts['rentals']}")
+                                next_log += 100_000
+                    if orders:
+                        flush()
+                    log(f"  rentals: {counts['rentals']} in {counts['orders']} orders")
+                    # Same for the customer ledger: one opening adjustment per customer
+                    rebuild_ledger(conn)
+
+                # Core inserts bypass the session listeners; stamp the catalog by hand
+                bump(SCOPES, conn)
+        finally:
+            if is_sqlite:
+                # Pooled connection: don't hand it on with synchronous=OFF
+                conn.exec_driver_sql(f"PRAGMA synchronous={synchronous}")
+                conn.commit()
+
+    if is_sqlite and products:
+        ensure_search_index(rebuild=True)
+
+    return GenerateResult(**counts, seconds=time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fill the database with synthetic data at production scale.")
+    parser.add_argument("--products", type=int, default=200_000)
+    parser.add_argument("--tools", type=int, default=5_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--rentals", type=int, default=1_000_000, help="Rental lines (grouped into orders + payments)")
+    parser.add_argument("--seed", type=int, default=1, help="Same seed, same data")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        result = generate(args.products, args.tools, args.users, args.rentals, args.seed, args.chunk_size)
+        print(
+            f"✅ Generated. Products: {result.products}, Tools: {result.tools}, Users: {result.users}, "
+            f"Orders: {result.orders}, Rentals: {result.rentals}, Payments: {result.payments} "
+            f"({result.seconds:.1f}s)"
+        )
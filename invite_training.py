@@ -0,0 +1,71 @@
+import argparse
+from datetime import datetime
+
+from app import create_app
+from app.extensions import db
+from app.forms_models import TrainingSession
+from app.services.training import TrainingError, assign_registrations, get_session, invite_session, seats_taken
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Schedule training sessions and send calendar invitations.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_create = sub.add_parser("create", help="Create a training session")
+    p_create.add_argument("course")
+    p_create.add_argument("starts_at", help="YYYY-MM-DDTHH:MM")
+    p_create.add_argument("--duration", type=int, default=60, help="Minutes")
+    p_create.add_argument("--capacity", type=int, default=20)
+    p_create.add_argument("--location", default="Grey Stone (TBD)")
+
+    sub.add_parser("list", help="List sessions and seats")
+
+    p_assign = sub.add_parser("assign", help="Seat unscheduled registrants of the same course")
+    p_assign.add_argument("session_id", type=int)
+
+    p_invite = sub.add_parser("invite", help="Queue invitations for everyone seated in a session")
+    p_invite.add_argument("session_id", type=int)
+    p_invite.add_argument("--assign", action="store_true", help="Fill free seats first")
+    p_invite.add_argument("--resend", action="store_true", help="Also re-invite people already invited")
+
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        try:
+            if args.command == "create":
+                if args.capacity < 1 or args.duration < 1:
+                    raise TrainingError("Capacity and duration must be positive.")
+                session = TrainingSession(
+                    course=args.course,
+                    starts_at=datetime.fromisoformat(args.starts_at),
+                    duration_minutes=args.duration,
+                    capacity=args.capacity,
+                    location=args.location,
+                )
+                db.session.add(session)
+                db.session.commit()
+                print(f"✅ Session {session.id} created: {session.course} at {session.starts_at}")
+
+            elif args.command == "list":
+                for s in db.session.scalars(db.select(TrainingSession).order_by(TrainingSession.starts_at)):
+                    print(f"{s.id:>4}  {s.starts_at:%Y-%m-%d %H:%M}  {s.course}  {seats_taken(s.id)}/{s.capacity}")
+
+            elif args.command == "assign":
+                seated = assign_registrations(get_session(args.session_id))
+                print(f"✅ Seated {seated} registrant(s) in session {args.session_id}")
+
+            elif args.command == "invite":
+                if args.assign:
+                    assign_registrations(get_session(args.session_id))
+                result = invite_session(args.session_id, resend=args.resend)
+                print(
+                    f"✅ Invitations queued: {result.queued}, Already invited: {result.already_invited}, "
+                    f"Over capacity: {result.over_capacity}. Run send_outbox.py to deliver."
+                )
+        except (TrainingError, ValueError) as e:
+            parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import argparse
+
+from app import create_app
+from app.extensions import db
+from app.ledger.balances import get_account, rebuild, set_credit_limit, verify
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify / rebuild the customer ledger and manage credit limits.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_verify = sub.add_parser("verify", help="Compare snapshots, entry sums and orders/payments")
+    p_verify.add_argument("--limit", type=int, default=20, help="Mismatches to print")
+
+    sub.add_parser("rebuild", help="Post adjustments for any difference and recompute all snapshots")
+
+    p_limit = sub.add_parser("set-limit", help="Set a customer's credit limit")
+    p_limit.add_argument("user_id", type=int)
+    p_limit.add_argument("credit_limit", help="MNT, or 'none' for no limit")
+
+    p_show = sub.add_parser("show", help="Show a customer's balance")
+    p_show.add_argument("user_id", type=int)
+
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.command == "verify":
+            mismatches = verify()
+            for m in mismatches[:args.limit]:
+                print(f"user {m.user_id:>8}  snapshot {m.snapshot:>14,}  ledger {m.ledger:>14,}  expected {m.expected:>14,}")
+            if mismatches:
+                print(f"❌ {len(mismatches)} customer(s) out of balance. Run: python manage_ledger.py rebuild")
+                raise SystemExit(1)
+            print("✅ Ledger balanced.")
+
+        elif args.command == "rebuild":
+            adjustments, snapshots = rebuild()
+            db.session.commit()
+            print(f"✅ Ledger rebuilt. Adjustments: {adjustments}, Snapshots: {snapshots}")
+
+        elif args.command == "set-limit":
+            limit = None if args.credit_limit.lower() == "none" else int(args.credit_limit)
+            set_credit_limit(args.user_id, limit)
+            db.session.commit()
+            print(f"✅ Credit limit for user {args.user_id}: {'none' if limit is None else f'{limit:,} MNT'}")
+
+        elif args.command == "show":
+            account = get_account(args.user_id)
+            print(f"Balance: {account.balance:,} MNT  Limit: {account.credit_limit}  Available: {account.available}")
+
+
+if __name__ == "__main__":
+    main()
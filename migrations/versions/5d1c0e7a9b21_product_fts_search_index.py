@@ -0,0 +1,36 @@
+"""product full-text search index (sqlite fts5)
+
+Revision ID: 5d1c0e7a9b21
+Revises: 3e290642b440
+Create Date: 2026-01-12 10:14:03.512876
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.products.search import FTS_DDL, FTS_DROP, FTS_REBUILD
+
+
+# revision identifiers, used by Alembic.
+revision = '5d1c0e7a9b21'
+down_revision = '3e290642b440'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 is SQLite-only; other backends use the LIKE fallback in app/products/search.py
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for stmt in FTS_DDL:
+        op.execute(stmt)
+    op.execute(FTS_REBUILD)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for stmt in FTS_DROP:
+        op.execute(stmt)
@@ -0,0 +1,37 @@
+import argparse
+import sys
+
+from app import create_app
+from app.payments.reconcile import StatementError, iter_statement, reconcile, write_report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Match a bank statement against unpaid payments (bank_reference + amount).")
+    parser.add_argument("statement", help="CSV or MT940 file")
+    parser.add_argument("--format", choices=["csv", "mt940"], help="Default: detect from the file")
+    parser.add_argument("--dry-run", action="store_true", help="Match and report, change nothing")
+    parser.add_argument("--report", help="Write unmatched / ambiguous lines to this CSV file")
+    parser.add_argument("--encoding", default="utf-8-sig")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        with open(args.statement, encoding=args.encoding, errors="replace", newline="") as f:
+            try:
+                result = reconcile(iter_statement(f, args.format), dry_run=args.dry_run)
+            except StatementError as e:
+                print(f"❌ {e}")
+                sys.exit(1)
+
+        if args.report:
+            with open(args.report, "w", encoding="utf-8", newline="") as out:
+                write_report(result.issues, out)
+
+        print(
+            f"✅ {'Dry run. ' if args.dry_run else ''}Lines: {result.lines}, Credits: {result.credits}, "
+            f"Matched: {result.matched}, Applied: {result.applied}, Unmatched: {result.unmatched}, "
+            f"Ambiguous: {result.ambiguous}, Amount mismatch: {result.amount_mismatch}, "
+            f"Duplicates: {result.duplicates} ({result.seconds:.2f}s)"
+        )
+        if args.report:
+            print(f"   Report: {args.report} ({len(result.issues)} line(s))")
@@ -1,10 +1,22 @@
+import argparse
 import csv
+import hashlib
 import os
 import re
+import time
+from collections import namedtuple
+
+from sqlalchemy import insert, update
 
 from app import create_app
 from app.extensions import db
 from app.products.models import Product
+from app.products.search import ensure_search_index
+
+# Rows per INSERT / UPDATE executemany batch
+CHUNK_SIZE = 1000
+
+SyncResult = namedtuple("SyncResult", "created updated unchanged deactivated skipped seconds")
 
 
 def parse_price_to_int_mnt(value: str) -> int:
@@ -34,13 +46,17 @@ def parse_price_to_int_mnt(value: str) -> int:
         return 0
 
 
-def seed_products_from_csv(csv_path: str):
-    if not os.path.exists(csv_path):
-        raise FileNotFoundError(f"CSV not found: {csv_path}")
+def row_hash(part: str, desc: str, uom, price_int: int) -> str:
+    """Checksum of the normalized row - equal hash means nothing to write."""
+    raw = "\x1f".join((part, desc, uom or "", str(price_int)))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
 
-    created = 0
-    updated = 0
 
+def iter_feed(csv_path: str):
+    """
+    Stream normalized rows from the CSV:
+    (part_number, description, uom, unit_price_mnt) or None for unusable rows.
+    """
     with open(csv_path, "r", encoding="latin1", newline="") as f:
         reader = csv.DictReader(f)
 
@@ -49,40 +65,111 @@ def seed_products_from_csv(csv_path: str):
         for row in reader:
             part = (row.get("Part number") or "").strip()
             desc = (row.get("Description") or "").strip()
-            uom = (row.get("UOM") or "").strip()
-            price_raw = row.get("Unit Price")
+            uom = (row.get("UOM") or "").strip() or None
+            price_int = parse_price_to_int_mnt(row.get("Unit Price"))
 
-            if not part or not desc:
+            if not part or not desc or price_int <= 0:
+                yield None
                 continue
+            yield part, desc, uom, price_int
 
-            price_int = parse_price_to_int_mnt(price_raw)
-            if price_int <= 0:
-                continue
 
-            existing = Product.query.filter_by(part_number=part).first()
-            if existing:
-                existing.description = desc
-                existing.uom = uom or None
-                existing.unit_price_mnt = price_int
-                updated += 1
-            else:
-                db.session.add(
-                    Product(
-                        part_number=part,
-                        description=desc,
-                        uom=uom or None,
-                        unit_price_mnt=price_int,
-                    )
-                )
-                created += 1
+def _chunks(rows, size):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
 
+
+def seed_products_from_csv(csv_path: str, full: bool = False, prune: bool = False) -> SyncResult:
+    """
+    Incremental sync: only rows whose content hash differs from the stored
+    one are written, in bulk. `full=True` rewrites every row; `prune=True`
+    soft-deletes (is_active=False) products that are no longer in the feed.
+    """
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"CSV not found: {csv_path}")
+
+    started = time.perf_counter()
+
+    # Triggers keep the FTS index in sync with the writes below;
+    # this only creates it when the DB was built without migrations.
+    ensure_search_index()
+
+    # part_number -> (id, content_hash, is_active), one narrow query
+    existing = {
+        part: (pid, chash, active)
+        for pid, part, chash, active in db.session.execute(
+            db.select(Product.id, Product.part_number, Product.content_hash, Product.is_active)
+        )
+    }
+
+    feed = {}
+    skipped = 0
+    for item in iter_feed(csv_path):
+        if item is None:
+            skipped += 1
+            continue
+        # Repeated part numbers in the feed: last row wins
+        feed[item[0]] = item
+
+    inserts = []
+    updates = []
+    unchanged = 0
+    for part, desc, uom, price_int in feed.values():
+        chash = row_hash(part, desc, uom, price_int)
+        values = {
+            "part_number": part,
+            "description": desc,
+            "uom": uom,
+            "unit_price_mnt": price_int,
+            "content_hash": chash,
+            "is_active": True,
+        }
+
+        current = existing.get(part)
+        if current is None:
+            inserts.append(values)
+        elif full or current[1] != chash or not current[2]:
+            updates.append({"id": current[0], **values})
+        else:
+            unchanged += 1
+
+    stale_ids = []
+    if prune:
+        stale_ids = [pid for part, (pid, _, active) in existing.items() if active and part not in feed]
+
+    for chunk in _chunks(inserts, CHUNK_SIZE):
+        db.session.execute(insert(Product), chunk)
+    for chunk in _chunks(updates, CHUNK_SIZE):
+        db.session.execute(update(Product), chunk)
+    for chunk in _chunks(stale_ids, CHUNK_SIZE):
+        db.session.execute(
+            update(Product).where(Product.id.in_(chunk)).values(is_active=False),
+            execution_options={"synchronize_session": False},
+        )
     db.session.commit()
-    return created, updated
+
+    return SyncResult(
+        created=len(inserts),
+        updated=len(updates),
+        unchanged=unchanged,
+        deactivated=len(stale_ids),
+        skipped=skipped,
+        seconds=time.perf_counter() - started,
+    )
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync the product catalog from the supplier CSV.")
+    parser.add_argument("csv_path", nargs="?", default=os.path.join("data", "product_catalog.csv"))
+    parser.add_argument("--full", action="store_true", help="Rewrite every row, ignoring content hashes")
+    parser.add_argument("--prune", action="store_true", help="Soft-delete products missing from the feed")
+    args = parser.parse_args()
+
     app = create_app()
     with app.app_context():
-        csv_path = os.path.join("data", "product_catalog.csv")
-        created, updated = seed_products_from_csv(csv_path)
-        print(f"✅ Products seeded. Created: {created}, Updated: {updated}")
+        result = seed_products_from_csv(args.csv_path, full=args.full, prune=args.prune)
+        print(
+            f"✅ Products synced. Created: {result.created}, Updated: {result.updated}, "
+            f"Unchanged: {result.unchanged}, Deactivated: {result.deactivated}, "
+            f"Skipped: {result.skipped} ({result.seconds:.2f}s)"
+        )
@@ -1,10 +1,22 @@
+import argparse
 import os
+import time
+from collections import namedtuple
+
 from openpyxl import load_workbook
+from sqlalchemy import insert, update
 
 from app import create_app
 from app.extensions import db
 from app.rent.models import Tool
 
+# Rows per INSERT / UPDATE executemany batch
+CHUNK_SIZE = 500
+
+TOOL_FIELDS = ("part_number", "name", "description", "available_qty", "daily_price", "daily_price_8_30")
+
+ImportResult = namedtuple("ImportResult", "created updated unchanged skipped seconds")
+
 
 def to_int_mnt(value) -> int:
     """
@@ -23,17 +35,73 @@ def to_int_mnt(value) -> int:
             return 0
 
 
-def seed_tools_from_excel(xlsx_path: str):
+def iter_sheet_rows(xlsx_path: str):
+    """
+    Stream (header, rows) from the active sheet in read-only mode, so memory
+    stays flat no matter how large the supplier's workbook is.
+    """
+    wb = load_workbook(xlsx_path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = [str(v).strip() if v is not None else "" for v in next(rows, ())]
+        yield header
+        yield from rows
+    finally:
+        wb.close()
+
+
+def parse_tool_row(row, idx_part, idx_desc, idx_qty, idx_price_1_7, idx_price_8_30):
+    """One sheet row -> dict of Tool fields, or None when the row is unusable."""
+    def cell(i):
+        return row[i] if 0 <= i < len(row) else None
+
+    part_number = str(cell(idx_part)).strip() if cell(idx_part) is not None else None
+    description = str(cell(idx_desc)).strip() if cell(idx_desc) is not None else ""
+    try:
+        available_qty = int(cell(idx_qty)) if cell(idx_qty) is not None else 0
+    except (TypeError, ValueError):
+        available_qty = 0
+
+    price_1_7 = to_int_mnt(cell(idx_price_1_7))
+    price_8_30 = to_int_mnt(cell(idx_price_8_30)) if idx_price_8_30 != -1 else 0
+
+    if not description:
+        return None
+    if available_qty < 0:
+        available_qty = 0
+    if price_1_7 <= 0:
+        return None
+
+    # Name = first part of description (keep it simple)
+    name = description.split(" (")[0].strip()
+    if len(name) > 160:
+        name = name[:160]
+
+    return {
+        "part_number": part_number or None,
+        "name": name,
+        "description": description,
+        "available_qty": available_qty,
+        "daily_price": price_1_7,
+        "daily_price_8_30": (price_8_30 if price_8_30 > 0 else None),
+    }
+
+
+def _flush(model, inserts, updates):
+    for i in range(0, len(inserts), CHUNK_SIZE):
+        db.session.execute(insert(model), inserts[i:i + CHUNK_SIZE])
+    for i in range(0, len(updates), CHUNK_SIZE):
+        # ORM bulk UPDATE by primary key (executemany)
+        db.session.execute(update(model), updates[i:i + CHUNK_SIZE])
+
+
+def seed_tools_from_excel(xlsx_path: str) -> ImportResult:
     if not os.path.exists(xlsx_path):
         raise FileNotFoundError(f"Excel file not found: {xlsx_path}")
 
-    wb = load_workbook(xlsx_path)
-    ws = wb.active
-
-    # Read header row
-    header = []
-    for cell in ws[1]:
-        header.append(str(cell.value).strip() if cell.value is not None else "")
+    started = time.perf_counter()
+    rows = iter_sheet_rows(xlsx_path)
+    header = next(rows)
 
     def col_index(name: str) -> int:
         # Return 0-based index
@@ -51,66 +119,81 @@ def seed_tools_from_excel(xlsx_path: str):
     if idx_desc == -1 or idx_qty == -1 or idx_price_1_7 == -1:
         raise ValueError("Missing required columns. Check Excel headers (Description, Available QTY, Daily price (1-7 days)).")
 
-    created = 0
-    updated = 0
-
-    # Start reading from row 2
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        part_number = (str(row[idx_part]).strip() if idx_part != -1 and row[idx_part] is not None else None)
-        description = (str(row[idx_desc]).strip() if row[idx_desc] is not None else "")
-        available_qty = int(row[idx_qty]) if row[idx_qty] is not None else 0
-
-        price_1_7 = to_int_mnt(row[idx_price_1_7])
-        price_8_30 = to_int_mnt(row[idx_price_8_30]) if idx_price_8_30 != -1 else 0
-
-        if not description:
-            continue
-        if available_qty < 0:
-            available_qty = 0
-        if price_1_7 <= 0:
+    # Prefetch every existing tool once instead of 1-2 lookups per row
+    existing = {}
+    by_part = {}
+    by_name_price = {}
+    for row in db.session.execute(db.select(Tool.id, *[getattr(Tool, f) for f in TOOL_FIELDS])).mappings():
+        values = dict(row)
+        existing[values["id"]] = values
+        if values["part_number"]:
+            by_part.setdefault(values["part_number"], values["id"])
+        by_name_price.setdefault((values["name"], values["daily_price"]), values["id"])
+
+    inserts = []
+    pending_by_part = {}
+    pending_by_name_price = {}
+    matched = {}
+    skipped = 0
+
+    for row in rows:
+        values = parse_tool_row(row, idx_part, idx_desc, idx_qty, idx_price_1_7, idx_price_8_30)
+        if values is None:
+            skipped += 1
             continue
 
-        # Name = first part of description (keep it simple)
-        name = description.split(" (")[0].strip()
-        if len(name) > 160:
-            name = name[:160]
-
         # Upsert by part_number when available, else by name+price
-        tool = None
-        if part_number:
-            tool = Tool.query.filter_by(part_number=part_number).first()
-
-        if tool is None:
-            tool = Tool.query.filter_by(name=name, daily_price=price_1_7).first()
-
-        if tool:
-            tool.part_number = part_number
-            tool.name = name
-            tool.description = description
-            tool.available_qty = available_qty
-            tool.daily_price = price_1_7
-            tool.daily_price_8_30 = (price_8_30 if price_8_30 > 0 else None)
-            updated += 1
-        else:
-            db.session.add(
-                Tool(
-                    part_number=part_number,
-                    name=name,
-                    description=description,
-                    available_qty=available_qty,
-                    daily_price=price_1_7,
-                    daily_price_8_30=(price_8_30 if price_8_30 > 0 else None),
-                )
-            )
-            created += 1
+        key_np = (values["name"], values["daily_price"])
+        tool_id = by_part.get(values["part_number"]) if values["part_number"] else None
+        if tool_id is None:
+            tool_id = by_name_price.get(key_np)
+
+        if tool_id is not None:
+            # Repeated rows within the same sheet: last one wins
+            matched[tool_id] = values
+            continue
 
+        pending = pending_by_part.get(values["part_number"]) if values["part_number"] else None
+        if pending is None:
+            pending = pending_by_name_price.get(key_np)
+        if pending is not None:
+            pending.update(values)
+        else:
+            pending = dict(values)
+            inserts.append(pending)
+        if values["part_number"]:
+            pending_by_part[values["part_number"]] = pending
+        pending_by_name_price[key_np] = pending
+
+    updates = [
+        {"id": tool_id, **values}
+        for tool_id, values in matched.items()
+        if any(existing[tool_id][f] != values[f] for f in TOOL_FIELDS)
+    ]
+
+    _flush(Tool, inserts, updates)
     db.session.commit()
-    return created, updated
+
+    return ImportResult(
+        created=len(inserts),
+        updated=len(updates),
+        unchanged=len(matched) - len(updates),
+        skipped=skipped,
+        seconds=time.perf_counter() - started,
+    )
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import the tool rental Excel catalog.")
+    parser.add_argument("xlsx_path", nargs="?", default=os.path.join("data", "tool_rent_catalog.xlsx"))
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows per bulk statement")
+    args = parser.parse_args()
+    CHUNK_SIZE = max(args.chunk_size, 1)
+
     app = create_app()
     with app.app_context():
-        xlsx_path = os.path.join("data", "tool_rent_catalog.xlsx")
-        created, updated = seed_tools_from_excel(xlsx_path)
-        print(f"✅ Tools seeded. Created: {created}, Updated: {updated}")
+        result = seed_tools_from_excel(args.xlsx_path)
+        print(
+            f"✅ Tools seeded. Created: {result.created}, Updated: {result.updated}, "
+            f"Unchanged: {result.unchanged}, Skipped: {result.skipped} ({result.seconds:.2f}s)"
+        )
@@ -0,0 +1,23 @@
+import argparse
+
+from app import create_app
+from app.outbox.sender import BATCH_SIZE, run_sender
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deliver queued emails from the outbox.")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Messages per SMTP connection")
+    parser.add_argument("--poll-interval", type=float, default=5.0, help="Seconds to sleep when the outbox is empty")
+    parser.add_argument("--batch-pause", type=float, default=None,
+                        help="Seconds to wait between full batches (default: OUTBOX_BATCH_PAUSE or 1; 0 = no throttling)")
+    parser.add_argument("--once", action="store_true", help="Drain the outbox and exit instead of polling")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        try:
+            sent, failed = run_sender(args.batch_size, args.poll_interval, once=args.once, batch_pause=args.batch_pause)
+        except KeyboardInterrupt:
+            sent = failed = None
+        if sent is not None:
+            print(f"✅ Outbox drained. Sent: {sent}, Failed attempts: {failed}")